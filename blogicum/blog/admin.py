@@ -1,6 +1,17 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.admin.widgets import AutocompleteSelect
 from django.contrib.auth.admin import UserAdmin
-from .models import Category, Comment, Location, Post, User
+from django.db import connections, models, transaction
+from django.db.models.functions import Substr
+
+from .cache import PAGES, invalidate
+from .forms import BoundedImageField
+from .models import Category, Comment, Location, Post, Task, User
+from .paginators import EstimatedCountPaginator
+from .search import get_backend as get_search_backend
+
+TEXT_PREVIEW_LENGTH = 50
 
 
 admin.site.unregister(User)
@@ -9,22 +20,91 @@ admin.site.register(User, UserAdmin)
 # Регистрация пользовательской модели с использованием UserAdmin
 
 
+class PreloadedAutocompleteSelect(AutocompleteSelect):
+    """Автокомплит, который берёт выбранный объект у формы, а не из базы.
+
+    В списке публикаций связанные объекты уже загружены через
+    ``list_select_related``; без этого виджет делал бы запрос на строку.
+    """
+
+    selected = None
+
+    def optgroups(self, name, value, attr=None):
+        selected = self.selected
+        if selected is None or {str(v) for v in value} != {str(selected.pk)}:
+            return super().optgroups(name, value, attr)
+        default = (None, [], 0)
+        if not self.is_required:
+            default[1].append(self.create_option(name, '', '', False, 0))
+        label = self.choices.field.label_from_instance(selected)
+        default[1].append(self.create_option(
+            name, selected.pk, label, True, len(default[1])))
+        return [default]
+
+
+class PostChangeList(ChangeList):
+    """Список публикаций без полного текста: в SQL берётся только начало."""
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('text').annotate(
+            text_preview=Substr('text', 1, TEXT_PREVIEW_LENGTH + 1))
+
+
 @admin.register(Post)  # первый способ
 class PostAdmin(admin.ModelAdmin):
     search_fields = ('text', )
     list_display = (
-        'id', 'title', 'author', 'text', 'category',
+        'id', 'title', 'author', 'text_preview', 'category',
         'pub_date', 'location', 'is_published', 'created_at',
     )
-    link_display_links = ('title',)
+    list_display_links = ('title',)
+    list_select_related = ('author', 'category', 'location')
+    formfield_overrides = {
+        models.ImageField: {'form_class': BoundedImageField},
+    }
     list_editable = ('category', 'is_published', 'location')
+    autocomplete_fields = ('author', 'category', 'location')
     list_filter = ('created_at', )
     empty_value_display = '-пусто-'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @admin.display(description='Текст')
+    def text_preview(self, obj):
+        text = obj.text_preview
+        if len(text) > TEXT_PREVIEW_LENGTH:
+            return text[:TEXT_PREVIEW_LENGTH] + '…'
+        return text
+
+    def get_changelist(self, request, **kwargs):
+        return PostChangeList
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.autocomplete_fields:
+            kwargs['widget'] = PreloadedAutocompleteSelect(
+                db_field, self.admin_site, using=kwargs.get('using'))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_form(self, request, **kwargs):
+        form_class = super().get_changelist_form(request, **kwargs)
+        names = self.autocomplete_fields
+
+        class ChangelistForm(form_class):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                for name in names:
+                    if name not in self.fields:
+                        continue
+                    widget = self.fields[name].widget
+                    widget = getattr(widget, 'widget', widget)
+                    widget.selected = getattr(self.instance, name, None)
+
+        return ChangelistForm
 
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    search_fields = ('description', )
+    search_fields = ('title', 'description')
     list_display = (
         'id', 'title', 'description', 'created_at', 'is_published', 'slug'
     )
@@ -41,9 +121,69 @@ class LocationAdmin(admin.ModelAdmin):
     search_fields = ('name', )
 
 
+class CommentChangeList(ChangeList):
+    """Список комментариев без текста публикаций, к которым они относятся."""
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer(
+            'post__text', 'post__excerpt')
+
+
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
     list_display = (
-        'text', 'author', 'created_at'
+        'text', 'author', 'post', 'created_at'
     )
-    search_fields = ('name', )
+    list_select_related = ('author', 'post')
+    search_fields = ('text', '=author__username', 'post__title')
+    autocomplete_fields = ('author', 'post')
+    date_hierarchy = 'created_at'
+
+    def get_changelist(self, request, **kwargs):
+        return CommentChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        backend = get_search_backend()
+        return backend.search_comments(queryset, search_term), False
+
+    def save_model(self, request, obj, form, change):
+        post_ids = {obj.post_id}
+        if change and 'post' in form.changed_data:
+            post_ids.add(form.initial['post'])
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            Post.objects.filter(pk__in=post_ids).update_comment_count()
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            super().delete_model(request, obj)
+            Post.objects.filter(pk=obj.post_id).update_comment_count()
+
+    def delete_queryset(self, request, queryset):
+        """Удаляет комментарии одним запросом DELETE.
+
+        ``QuerySet.delete()`` загрузил бы каждый комментарий ради сигналов
+        удаления, поэтому запрос строится из подзапроса выбранных ключей,
+        а счётчики, поисковый индекс и кэш страниц обновляются здесь сразу
+        для всех затронутых публикаций.
+        """
+        connection = connections[queryset.db]
+        table = connection.ops.quote_name(queryset.model._meta.db_table)
+        sql, params = queryset.order_by().values('pk').query.sql_with_params()
+        with transaction.atomic(using=queryset.db):
+            post_ids = set(
+                queryset.order_by().values_list('post_id', flat=True)
+                .distinct())
+            get_search_backend().remove_comments(queryset)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {table} WHERE id IN ({sql})', params)
+            Post.objects.filter(pk__in=post_ids).update_comment_count()
+        invalidate(PAGES)
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'args', 'status', 'attempts', 'updated_at')
+    list_filter = ('status', 'name')
+    readonly_fields = ('name', 'args', 'attempts', 'error', 'created_at')
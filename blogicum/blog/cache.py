@@ -0,0 +1,59 @@
+from math import ceil
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db.models import Min
+from django.utils import timezone
+
+FEEDS = 'feeds'
+PAGES = 'pages'
+
+
+def _version_key(namespace):
+    return f'blog:{namespace}:version'
+
+
+def get_version(namespace):
+    return cache.get_or_set(_version_key(namespace), uuid4().hex, None)
+
+
+def invalidate(*namespaces):
+    cache.set_many(
+        {_version_key(namespace): uuid4().hex for namespace in namespaces},
+        None
+    )
+
+
+def versioned_key(namespace, key):
+    return f'blog:{namespace}:{get_version(namespace)}:{key}'
+
+
+def get_next_publication(feed, scheduled_posts):
+    """Дата ближайшей отложенной публикации ленты.
+
+    Значение кэшируется до самой этой даты, поэтому лента узнаёт
+    о наступившей публикации без запроса к базе на каждый просмотр.
+    """
+    key = versioned_key(FEEDS, f'next_publication:{feed}')
+    cached = cache.get(key)
+    if cached is not None:
+        return cached[0]
+    next_pub_date = scheduled_posts.aggregate(
+        next_pub_date=Min('pub_date'))['next_pub_date']
+    timeout = None
+    if next_pub_date is not None:
+        timeout = seconds_until(next_pub_date)
+    cache.set(key, (next_pub_date,), timeout)
+    return next_pub_date
+
+
+def seconds_until(moment):
+    return max(ceil((moment - timezone.now()).total_seconds()), 1)
+
+
+def feed_cache_timeout(timeout, feed, scheduled_posts):
+    """Время жизни кэша ленты, не превышающее срок до новой публикации."""
+    next_pub_date = get_next_publication(feed, scheduled_posts)
+    if next_pub_date is None:
+        return timeout
+    return min(timeout, seconds_until(next_pub_date))
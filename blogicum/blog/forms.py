@@ -1,6 +1,77 @@
+import tempfile
+
 from django import forms
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.template.defaultfilters import filesizeformat
 from django.utils import timezone
+from PIL import Image
+
+from .images import read_image_header, strip_metadata
 from .models import Post, Comment
+from .uploads import OversizedUploadedFile
+
+
+class BoundedImageField(forms.ImageField):
+    """Поле изображения с ограничением размера файла и числа пикселей.
+
+    Размеры проверяются по заголовку файла до полной проверки Pillow,
+    а из принятого изображения удаляются метаданные.
+    """
+
+    default_error_messages = {
+        'too_large': 'Размер файла не должен превышать %(limit)s.',
+        'too_many_pixels': (
+            'Изображение слишком большое: не более %(limit)s пикселей.'),
+    }
+
+    def to_python(self, data):
+        if data in self.empty_values:
+            return None
+        if (isinstance(data, OversizedUploadedFile)
+                or data.size > settings.UPLOAD_MAX_FILE_SIZE):
+            raise forms.ValidationError(
+                self.error_messages['too_large'], code='too_large',
+                params={'limit': filesizeformat(
+                    settings.UPLOAD_MAX_FILE_SIZE)})
+        try:
+            image_format, (width, height), orientation = (
+                read_image_header(data))
+        except Exception:
+            image_format = None
+        if image_format is None:
+            # Нераспознанный файл: сообщение об ошибке даст ImageField.
+            return super().to_python(data)
+        if (width * height > settings.POST_IMAGE_MAX_PIXELS
+                or width * height > Image.MAX_IMAGE_PIXELS):
+            raise forms.ValidationError(
+                self.error_messages['too_many_pixels'],
+                code='too_many_pixels',
+                params={'limit': settings.POST_IMAGE_MAX_PIXELS})
+        data = super().to_python(data)
+        return self._strip_metadata(data, image_format, orientation)
+
+    def _strip_metadata(self, data, image_format, orientation):
+        # Безымянный временный файл: хранилище копирует его содержимое,
+        # а не переносит файл, и он удаляется при закрытии.
+        stripped = UploadedFile(
+            tempfile.TemporaryFile(dir=settings.FILE_UPLOAD_TEMP_DIR),
+            data.name, data.content_type, 0, data.charset)
+        try:
+            if not strip_metadata(
+                    data.file, stripped.file, image_format, orientation):
+                stripped.close()
+                data.seek(0)
+                return data
+        except ValueError:
+            stripped.close()
+            raise forms.ValidationError(
+                self.error_messages['invalid_image'], code='invalid_image')
+        stripped.size = stripped.file.tell()
+        stripped.seek(0)
+        stripped.image = data.image
+        data.close()
+        return stripped
 
 
 class PostForm(forms.ModelForm):
@@ -15,6 +86,7 @@ class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         exclude = ('author',)
+        field_classes = {'image': BoundedImageField}
         widgets = {
             'pub_date': forms.DateTimeInput(
                 format='%Y-%m-%dT%H:%M', attrs={'type': 'datetime-local'})
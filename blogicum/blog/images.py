@@ -0,0 +1,195 @@
+import os
+import shutil
+import struct
+import warnings
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+COPY_BUFFER_SIZE = 64 * 1024
+ORIENTATION_TAG = 0x0112
+
+# Сегменты JPEG, которые удаляются из загруженных файлов: EXIF и XMP
+# (APP1), IPTC (APP13) и комментарии. ICC-профиль (APP2) и маркер Adobe
+# (APP14) нужны для правильной передачи цвета и сохраняются.
+JPEG_METADATA_MARKERS = {0xE1, 0xED, 0xFE}
+# Маркеры JPEG без поля длины.
+JPEG_STANDALONE_MARKERS = {0x01, *range(0xD0, 0xD8)}
+JPEG_START_OF_SCAN = 0xDA
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_METADATA_CHUNKS = {b'eXIf', b'tEXt', b'zTXt', b'iTXt', b'tIME'}
+
+DERIVATIVE_FORMATS = {
+    'jpg': ('JPEG', {'quality': 80, 'optimize': True, 'progressive': True}),
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+}
+
+
+def derivative_name(name, width, extension):
+    root, _ = os.path.splitext(name)
+    return f'{root}_w{width}.{extension}'
+
+
+def _encode(image, extension):
+    image_format, options = DERIVATIVE_FORMATS[extension]
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    buffer = BytesIO()
+    image.save(buffer, image_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def generate_derivatives(image_file):
+    """Сохраняет рядом с оригиналом уменьшенные копии в JPEG и WebP.
+
+    Возвращает список ширин, для которых созданы копии: изображение
+    не увеличивается, поэтому ширины больше оригинала пропускаются.
+    """
+    storage = image_file.storage
+    with image_file.open('rb') as file:
+        original = ImageOps.exif_transpose(Image.open(file))
+        original.load()
+    widths = [
+        width for width in sorted(settings.POST_IMAGE_WIDTHS)
+        if width < original.width
+    ]
+    for width in widths:
+        names = {
+            extension: derivative_name(image_file.name, width, extension)
+            for extension in DERIVATIVE_FORMATS
+        }
+        if all(storage.exists(name) for name in names.values()):
+            # Копии имени из хеша содержимого уже созданы для другой
+            # публикации с тем же изображением.
+            continue
+        height = round(original.height * width / original.width)
+        resized = original.resize((width, height), Image.Resampling.LANCZOS)
+        for extension, name in names.items():
+            storage.delete(name)
+            storage.save(name, _encode(resized, extension))
+    return widths
+
+
+def delete_image(storage, name):
+    """Удаляет изображение вместе со всеми его уменьшенными копиями."""
+    storage.delete(name)
+    for width in settings.POST_IMAGE_WIDTHS:
+        for extension in DERIVATIVE_FORMATS:
+            storage.delete(derivative_name(name, width, extension))
+
+
+def _jpeg_orientation(image):
+    # Ориентация берётся из уже прочитанного сегмента APP1: getexif()
+    # у некоторых форматов (например, PNG без eXIf) декодирует растр.
+    if image.format != 'JPEG' or 'exif' not in image.info:
+        return 1
+    exif = Image.Exif()
+    exif.load(image.info['exif'])
+    return exif.get(ORIENTATION_TAG, 1)
+
+
+def read_image_header(file):
+    """Возвращает формат, размеры и ориентацию изображения.
+
+    Читается только заголовок файла: Pillow откладывает декодирование
+    растра до первого обращения к пикселям, а ориентация читается
+    только у JPEG из сегмента EXIF. Предупреждение Pillow о слишком
+    больших изображениях подавляется — проверку размеров делает
+    вызывающий код.
+    """
+    file.seek(0)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', Image.DecompressionBombWarning)
+        image = Image.open(file)
+        orientation = _jpeg_orientation(image)
+    file.seek(0)
+    return image.format, image.size, orientation
+
+
+def _copy(source, destination, length):
+    while length > 0:
+        chunk = source.read(min(length, COPY_BUFFER_SIZE))
+        if not chunk:
+            raise ValueError('Файл изображения обрезан.')
+        destination.write(chunk)
+        length -= len(chunk)
+
+
+def _read_jpeg_marker(source):
+    byte = source.read(1)
+    if byte and byte != b'\xff':
+        raise ValueError('Некорректная структура JPEG.')
+    marker = byte and source.read(1)
+    while marker == b'\xff':
+        marker = source.read(1)
+    return marker
+
+
+def _strip_jpeg(source, destination, orientation):
+    destination.write(source.read(2))
+    if orientation != 1:
+        # Ориентация нужна для поворота уменьшенных копий, поэтому от
+        # EXIF остаётся только она.
+        exif = Image.Exif()
+        exif[ORIENTATION_TAG] = orientation
+        payload = exif.tobytes()
+        destination.write(struct.pack('>BBH', 0xFF, 0xE1, len(payload) + 2))
+        destination.write(payload)
+    while True:
+        marker = _read_jpeg_marker(source)
+        if not marker:
+            return
+        code = marker[0]
+        if code in JPEG_STANDALONE_MARKERS:
+            destination.write(b'\xff' + marker)
+            continue
+        length_bytes = source.read(2)
+        if len(length_bytes) != 2:
+            raise ValueError('Файл изображения обрезан.')
+        length = struct.unpack('>H', length_bytes)[0] - 2
+        if code in JPEG_METADATA_MARKERS:
+            source.seek(length, os.SEEK_CUR)
+            continue
+        destination.write(b'\xff' + marker + length_bytes)
+        _copy(source, destination, length)
+        if code == JPEG_START_OF_SCAN:
+            # Дальше идут сжатые данные до конца файла: копируем как есть.
+            shutil.copyfileobj(source, destination, COPY_BUFFER_SIZE)
+            return
+
+
+def _strip_png(source, destination):
+    destination.write(source.read(len(PNG_SIGNATURE)))
+    while True:
+        header = source.read(8)
+        if not header:
+            return
+        if len(header) != 8:
+            raise ValueError('Файл изображения обрезан.')
+        length, chunk_type = struct.unpack('>I4s', header)
+        if chunk_type in PNG_METADATA_CHUNKS:
+            source.seek(length + 4, os.SEEK_CUR)
+            continue
+        destination.write(header)
+        _copy(source, destination, length + 4)
+
+
+def strip_metadata(source, destination, image_format, orientation=1):
+    """Копирует изображение без метаданных, не декодируя растр.
+
+    JPEG и PNG переписываются по сегментам: удаляются блоки с EXIF,
+    XMP, текстовыми комментариями и датой. Возвращает ``False``, если
+    формат не поддерживается и файл нужно оставить как есть.
+    """
+    source.seek(0)
+    if image_format == 'JPEG':
+        _strip_jpeg(source, destination, orientation)
+    elif image_format == 'PNG':
+        _strip_png(source, destination)
+    else:
+        return False
+    return True
@@ -0,0 +1,75 @@
+import os
+from pathlib import Path
+from urllib.request import urlopen
+
+import django_bootstrap5
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.stylesheets import find_words, purge
+
+CONTENT_EXTENSIONS = ('.html', '.py', '.txt')
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает CSS сайта из Bootstrap: оставляет только правила для'
+        ' классов, которые встречаются в шаблонах и формах.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source', default=str(
+                Path(settings.STATICFILES_DIRS[0]) / 'css/bootstrap.min.css'),
+            help='Путь или URL исходного CSS Bootstrap.')
+        parser.add_argument(
+            '--output', default=str(
+                Path(settings.STATICFILES_DIRS[0]) / settings.SITE_CSS),
+            help='Файл, в который записывается собранный CSS.')
+        parser.add_argument(
+            '--safelist', nargs='*', default=(),
+            help='Классы, которые нужно сохранить, даже если они не'
+                 ' найдены в шаблонах.')
+
+    def content_dirs(self):
+        """Шаблоны проекта, код приложений и шаблоны django_bootstrap5.
+
+        Классы форм и кнопок django_bootstrap5 задаёт в своём коде,
+        поэтому он просматривается вместе с шаблонами проекта.
+        """
+        dirs = [Path(path) for engine in settings.TEMPLATES
+                for path in engine['DIRS']]
+        dirs += [
+            Path(app.path) for app in apps.get_app_configs()
+            if str(app.path).startswith(str(settings.BASE_DIR))
+        ]
+        dirs.append(Path(django_bootstrap5.__file__).parent)
+        return dirs
+
+    def used_words(self, safelist):
+        words = set(safelist)
+        for directory in self.content_dirs():
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    if name.endswith(CONTENT_EXTENSIONS):
+                        path = Path(root, name)
+                        words |= find_words(path.read_text(errors='ignore'))
+        return words
+
+    def read_source(self, source):
+        try:
+            if source.startswith(('http://', 'https://')):
+                with urlopen(source, timeout=30) as response:
+                    return response.read().decode()
+            return Path(source).read_text()
+        except OSError as error:
+            raise CommandError(f'Не удалось прочитать {source}: {error}')
+
+    def handle(self, *args, source, output, safelist, **options):
+        css = self.read_source(source)
+        result = purge(css, self.used_words(safelist))
+        Path(output).parent.mkdir(parents=True, exist_ok=True)
+        Path(output).write_text(result)
+        self.stdout.write(self.style.SUCCESS(
+            f'{output}: {len(result)} байт из {len(css)}'))
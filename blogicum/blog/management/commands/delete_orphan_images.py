@@ -0,0 +1,38 @@
+import os
+import re
+
+from django.core.management.base import BaseCommand
+
+from blog.images import delete_image
+from blog.models import Post
+
+ORIGINAL_RE = re.compile(r'^[0-9a-f]{64}\.\w+$')
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет изображения, на которые не ссылается ни одна публикация,'
+        ' вместе с их уменьшенными копиями.'
+    )
+
+    def originals(self, storage):
+        root = storage.path(storage.directory)
+        for directory, _, files in os.walk(root):
+            for file_name in files:
+                if ORIGINAL_RE.match(file_name):
+                    path = os.path.join(directory, file_name)
+                    yield os.path.relpath(path, storage.location).replace(
+                        os.sep, '/')
+
+    def handle(self, *args, **options):
+        storage = Post._meta.get_field('image').storage
+        deleted = 0
+        for name in self.originals(storage):
+            with storage.lock():
+                if (storage.recently_used(name)
+                        or Post.objects.filter(image=name).exists()):
+                    continue
+                delete_image(storage, name)
+            deleted += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Удалено изображений: {deleted}'))
@@ -0,0 +1,59 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from blog.tasks import claim_tasks, execute_task
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди в базе данных.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=2,
+            help='Количество процессов-обработчиков; 0 — выполнять задачи'
+                 ' в текущем процессе.')
+        parser.add_argument(
+            '--batch-size', type=int, default=10,
+            help='Количество задач, забираемых из очереди за один раз.')
+        parser.add_argument(
+            '--sleep', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить задачи, которые уже в очереди, и завершиться.')
+
+    def handle(self, *args, processes, batch_size, sleep, once, **options):
+        executor = None
+        if processes:
+            executor = ProcessPoolExecutor(
+                max_workers=processes, initializer=django.setup)
+        done = 0
+        try:
+            while True:
+                batch = claim_tasks(batch_size)
+                if not batch:
+                    if once:
+                        break
+                    time.sleep(sleep)
+                    continue
+                if executor is None:
+                    statuses = map(execute_task, batch)
+                else:
+                    # Пул запускает процессы по мере надобности, уже после
+                    # claim_tasks(). Соединение с базой не должно
+                    # наследоваться дочерними процессами: закрываем его
+                    # перед каждой раздачей задач, и обработчики
+                    # открывают свои.
+                    connections.close_all()
+                    statuses = executor.map(execute_task, batch)
+                done += len(list(statuses))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        self.stdout.write(self.style.SUCCESS(f'Выполнено задач: {done}'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post
+from blog.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс публикаций.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            get_backend().rebuild(Post.objects.order_by('pk'))
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс перестроен.'))
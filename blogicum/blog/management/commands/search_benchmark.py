@@ -0,0 +1,76 @@
+import json
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.stemmer import TermDictionary, WORD_RE, normalize, tokenize
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет токенизацию и стемминг на публикациях и комментариях'
+        ' из фикстуры, повторённых --scale раз.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fixture',
+            default=str(Path(settings.BASE_DIR).parent / 'db.json'),
+            help='JSON-фикстура с публикациями.')
+        parser.add_argument(
+            '--scale', type=int, default=100,
+            help='Во сколько раз увеличить корпус.')
+
+    def load_corpus(self, fixture):
+        try:
+            objects = json.loads(Path(fixture).read_text())
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Не удалось прочитать {fixture}: {error}')
+        corpus = []
+        for obj in objects:
+            fields = obj['fields']
+            if obj['model'] == 'blog.post':
+                corpus += [fields['title'], fields['text']]
+            elif obj['model'] == 'blog.comment':
+                corpus.append(fields['text'])
+        if not corpus:
+            raise CommandError(f'В {fixture} нет публикаций.')
+        return corpus
+
+    def timed(self, func, corpus):
+        start = time.perf_counter()
+        for text in corpus:
+            func(text)
+        return time.perf_counter() - start
+
+    def handle(self, *args, fixture, scale, **options):
+        corpus = self.load_corpus(fixture) * scale
+        words = [word for text in corpus for word in WORD_RE.findall(text)]
+        dictionary = TermDictionary()
+
+        naive = self.timed(lambda text: WORD_RE.findall(text.lower()), corpus)
+        cold = self.timed(lambda text: normalize(text, TermDictionary()),
+                          corpus[:len(corpus) // scale])
+        warm = self.timed(lambda text: normalize(text, dictionary), corpus)
+        tokens = [word for text in corpus for word in tokenize(text)]
+        stems = {dictionary[word] for word in tokens}
+        query_terms = tokens[:1000]
+        start = time.perf_counter()
+        for word in query_terms:
+            dictionary[word]
+        per_term = (time.perf_counter() - start) / max(len(query_terms), 1)
+
+        self.stdout.write(
+            f'Текстов: {len(corpus)}, слов: {len(words)}\n'
+            f'Разных слов без стемминга: '
+            f'{len({word.lower() for word in words})}\n'
+            f'Разных основ в индексе: {len(stems)}'
+            f' (словарь терминов: {len(dictionary)})\n'
+            f'Индексируемых слов без служебных: {len(tokens)}\n'
+            f'Токенизация без стемминга: {naive:.3f} с\n'
+            f'Стемминг исходного корпуса без словаря: {cold:.3f} с\n'
+            f'Стемминг корпуса x{scale} со словарём: {warm:.3f} с\n'
+            f'Нормализация слова запроса: {per_term * 1e6:.2f} мкс'
+        )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённое количество комментариев публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество публикаций, обновляемых одним запросом.')
+
+    def handle(self, *args, batch_size, **options):
+        post_ids = Post.objects.order_by('pk').values_list('pk', flat=True)
+        updated = 0
+        last_id = 0
+        while True:
+            batch = list(post_ids.filter(pk__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1]
+            updated += Post.objects.filter(
+                pk__gte=batch[0], pk__lte=last_id
+            ).update_comment_count()
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено публикаций: {updated}'))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post, make_excerpt
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённые анонсы публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество публикаций, обновляемых одним запросом.')
+
+    def handle(self, *args, batch_size, **options):
+        posts = Post.objects.only('text', 'excerpt').order_by('pk')
+        updated = 0
+        last_id = 0
+        while True:
+            batch = list(posts.filter(pk__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].pk
+            changed = []
+            for post in batch:
+                excerpt = make_excerpt(post.text)
+                if post.excerpt != excerpt:
+                    post.excerpt = excerpt
+                    changed.append(post)
+            Post.objects.bulk_update(changed, ('excerpt',))
+            updated += len(changed)
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено публикаций: {updated}'))
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.16 on 2026-10-18 17:29
+
+import blog.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_task'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, db_index=True, storage=blog.storage.ContentAddressedStorage(), upload_to='', verbose_name='Изображение публикации'),
+        ),
+    ]
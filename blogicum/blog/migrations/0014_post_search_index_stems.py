@@ -0,0 +1,56 @@
+from django.db import migrations
+
+from blog.stemmer import normalize
+
+
+def rebuild_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS blog_post_fts')
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE blog_post_fts USING fts5('
+        "title, text, comments, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    comments = {}
+    for post_id, text in Comment.objects.values_list('post_id', 'text'):
+        comments.setdefault(post_id, []).append(text)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO blog_post_fts (rowid, title, text, comments)'
+            ' VALUES (%s, %s, %s, %s)',
+            (
+                (pk, normalize(title), normalize(text),
+                 normalize(' '.join(comments.get(pk, ()))))
+                for pk, title, text
+                in Post.objects.values_list('pk', 'title', 'text').iterator()
+            ),
+        )
+
+
+def restore_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS blog_post_fts')
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE blog_post_fts USING fts5('
+        "title, text, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    Post = apps.get_model('blog', 'Post')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO blog_post_fts (rowid, title, text) VALUES (%s, %s, %s)',
+            Post.objects.values_list('pk', 'title', 'text').iterator(),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_post_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_search_index, restore_search_index),
+    ]
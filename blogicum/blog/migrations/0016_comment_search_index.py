@@ -0,0 +1,74 @@
+from django.db import migrations
+
+from blog.stemmer import normalize
+
+
+def split_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS blog_post_fts')
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE blog_post_fts USING fts5('
+        "title, text, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE IF NOT EXISTS blog_comment_fts USING fts5('
+        "text, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO blog_post_fts (rowid, title, text) VALUES (%s, %s, %s)',
+            (
+                (pk, normalize(title), normalize(text))
+                for pk, title, text
+                in Post.objects.values_list('pk', 'title', 'text').iterator()
+            ),
+        )
+        cursor.executemany(
+            'INSERT INTO blog_comment_fts (rowid, text) VALUES (%s, %s)',
+            (
+                (pk, normalize(text))
+                for pk, text
+                in Comment.objects.values_list('pk', 'text').iterator()
+            ),
+        )
+
+
+def merge_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS blog_comment_fts')
+    schema_editor.execute('DROP TABLE IF EXISTS blog_post_fts')
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE blog_post_fts USING fts5('
+        "title, text, comments, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    comments = {}
+    for post_id, text in Comment.objects.values_list('post_id', 'text'):
+        comments.setdefault(post_id, []).append(text)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO blog_post_fts (rowid, title, text, comments)'
+            ' VALUES (%s, %s, %s, %s)',
+            (
+                (pk, normalize(title), normalize(text),
+                 normalize(' '.join(comments.get(pk, ()))))
+                for pk, title, text
+                in Post.objects.values_list('pk', 'title', 'text').iterator()
+            ),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_comment_created_at_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(split_search_index, merge_search_index),
+    ]
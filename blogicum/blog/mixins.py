@@ -1,17 +1,31 @@
+from django.conf import settings
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.http import Http404
 from django.shortcuts import redirect
 from django.urls import reverse
+from django.utils.http import urlencode
 
+from .cache import PAGES, feed_cache_timeout, versioned_key
 from .forms import CommentForm, PostForm
 from .models import Comment
+from .paginators import CachedCountPaginator, CursorPaginator
 
 
 class OnlyAuthorMixin(UserPassesTestMixin):
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
+
     def test_func(self):
-        return self.get_object().author == self.request.user
+        return self.get_object().author_id == self.request.user.id
 
     def handle_no_permission(self):
-        return redirect('blog:post_detail', post_id=self.get_object().pk)
+        return redirect('blog:post_detail', post_id=self.kwargs['post_id'])
 
 
 class CommentEditMixin:
@@ -40,3 +54,104 @@ class PostEditMixin:
 class CommentPkMixin:
     pk_url_kwarg = 'comment_id'
     template_name = 'blog/comment.html'
+
+
+class CursorPaginationMixin:
+    cursor_kwarg = 'cursor'
+    cursor_ordering = ('-pub_date', '-id')
+
+    def paginate_queryset(self, queryset, page_size):
+        if not settings.CURSOR_PAGINATION:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size, self.cursor_ordering)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class ScheduledFeedMixin:
+    """Лента, кэш которой истекает к ближайшей отложенной публикации.
+
+    По умолчанию у страницы нет ни ключа ленты, ни отложенных
+    публикаций, и время жизни кэша не меняется.
+    """
+
+    feed_key = None
+
+    def get_feed_key(self):
+        return self.feed_key
+
+    def get_scheduled_posts(self):
+        return None
+
+    def get_cache_timeout(self, timeout):
+        feed_key = self.get_feed_key()
+        scheduled_posts = self.get_scheduled_posts()
+        if feed_key is None or scheduled_posts is None:
+            return timeout
+        return feed_cache_timeout(timeout, feed_key, scheduled_posts)
+
+
+class CachedCountPaginationMixin(ScheduledFeedMixin):
+    """Пагинация с кэшированным числом объектов ленты.
+
+    Без ``get_count_queryset()`` считается сам запрос ленты, а без
+    ключа ленты число объектов не кэшируется.
+    """
+
+    paginator_class = CachedCountPaginator
+
+    def get_count_queryset(self):
+        return None
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset,
+            per_page,
+            count_queryset=self.get_count_queryset(),
+            cache_key=self.get_feed_key(),
+            scheduled_posts=self.get_scheduled_posts(),
+            **kwargs
+        )
+
+
+class AnonymousPageCacheMixin(ScheduledFeedMixin):
+    """Отдаёт анонимным читателям закэшированную страницу целиком.
+
+    Ключ кэша строится из пути и только тех параметров запроса, которые
+    читает страница (``cache_query_params``), поэтому произвольные
+    параметры не создают новых копий страницы.
+    """
+
+    cache_query_params = ('page', 'cursor')
+
+    def get_page_cache_key(self, request):
+        params = urlencode([
+            (name, request.GET[name]) for name in self.cache_query_params
+            if name in request.GET
+        ])
+        return f'{request.path}?{params}'
+
+    def dispatch(self, request, *args, **kwargs):
+        if (not settings.PAGE_CACHE_TIMEOUT or request.method != 'GET'
+                or request.user.is_authenticated):
+            return super().dispatch(request, *args, **kwargs)
+        key = versioned_key(PAGES, self.get_page_cache_key(request))
+        response = cache.get(key)
+        if response is not None:
+            return response
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda response: self.cache_response(key, response)
+            )
+        return response
+
+    def cache_response(self, key, response):
+        if self.request.META.get('CSRF_COOKIE_USED') or response.cookies:
+            return
+        cache.set(
+            key, response,
+            self.get_cache_timeout(settings.PAGE_CACHE_TIMEOUT))
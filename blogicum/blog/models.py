@@ -1,10 +1,20 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.conf import settings
+from django.utils.text import Truncator
+from django.utils.timezone import now
+from .cache import FEEDS, PAGES, invalidate
+from .images import derivative_name, generate_derivatives
+from .storage import ContentAddressedStorage
 from .published_post import PublishedPostQuerySet
 User = get_user_model()
 
 
+def make_excerpt(text):
+    """Анонс для карточки публикации: первые слова текста."""
+    return Truncator(text).words(settings.POST_EXCERPT_WORDS, truncate=' …')
+
+
 class BaseBlogModel(models.Model):
 
     is_published = models.BooleanField(
@@ -13,6 +23,7 @@ class BaseBlogModel(models.Model):
         help_text='Снимите галочку, чтобы скрыть публикацию.')
 
     created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
 
     class Meta:
         abstract = True
@@ -53,6 +64,7 @@ class Post(BaseBlogModel):
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Автор публикации',
     )
     category = models.ForeignKey(
@@ -70,8 +82,13 @@ class Post(BaseBlogModel):
 
     image = models.ImageField(
         verbose_name='Изображение публикации',
-        blank=True
+        blank=True,
+        db_index=True,
+        storage=ContentAddressedStorage(),
     )
+    image_widths = models.JSONField(
+        'Ширины уменьшенных копий изображения',
+        default=list, blank=True, editable=False)
     pub_date = models.DateTimeField(
         verbose_name='Дата и время публикации',
         help_text='Если установить дату и время в будущем — '
@@ -79,6 +96,9 @@ class Post(BaseBlogModel):
     )
     title = models.CharField('Заголовок', max_length=settings.MAX_FIELD_LENGTH)
     text = models.TextField('Текст')
+    excerpt = models.TextField('Анонс', blank=True, editable=False)
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев', default=0, editable=False)
 
     objects = PublishedPostQuerySet.as_manager()
 
@@ -87,10 +107,65 @@ class Post(BaseBlogModel):
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ['-pub_date']
+        indexes = (
+            models.Index(
+                fields=('-pub_date',),
+                name='post_published_idx',
+                condition=models.Q(is_published=True)),
+            models.Index(
+                fields=('category', '-pub_date'),
+                name='post_category_pub_date_idx',
+                condition=models.Q(is_published=True)),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_pub_date_idx'),
+        )
 
     def __str__(self) -> str:
         return self.title[:settings.REPRESENTATION_LENGTH]
 
+    def save(self, *args, update_fields=None, **kwargs):
+        # Отложенный текст не сохраняется и не меняется: загружать его
+        # ради выдержки не нужно.
+        text_loaded = 'text' not in self.get_deferred_fields()
+        if (update_fields is None and text_loaded
+                or update_fields is not None and 'text' in update_fields):
+            self.excerpt = make_excerpt(self.text)
+            if update_fields is not None:
+                update_fields = {*update_fields, 'excerpt'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+    def _image_srcset(self, extension):
+        storage, name = self.image.storage, self.image.name
+        return ', '.join(
+            f'{storage.url(derivative_name(name, width, extension))} {width}w'
+            for width in self.image_widths
+        )
+
+    @property
+    def image_srcset(self):
+        return self._image_srcset('jpg')
+
+    @property
+    def image_webp_srcset(self):
+        return self._image_srcset('webp')
+
+    def update_image_derivatives(self):
+        """Создаёт уменьшенные копии и сохраняет их ширины.
+
+        Ширины записываются, только если у публикации всё ещё то же
+        изображение: задача для заменённого файла не должна затереть
+        ширины нового.
+        """
+        name = self.image.name or ''
+        self.image_widths = generate_derivatives(self.image) if name else []
+        self.updated_at = now()
+        updated = Post.objects.filter(pk=self.pk, image=name).update(
+            image_widths=self.image_widths, updated_at=self.updated_at)
+        if updated:
+            invalidate(FEEDS, PAGES)
+        return bool(updated)
+
 
 class Comment(models.Model):
     author = models.ForeignKey(
@@ -117,6 +192,54 @@ class Comment(models.Model):
         verbose_name_plural = "Комментарии"
         ordering = ("created_at",)
         default_related_name = "comments"
+        indexes = (
+            models.Index(
+                fields=('created_at',),
+                name='comment_created_at_idx'),
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_created_at_idx'),
+        )
 
     def __str__(self):
         return self.text
+
+
+class Task(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('Задача', max_length=settings.MAX_FIELD_LENGTH)
+    args = models.JSONField('Аргументы', default=list, blank=True)
+    status = models.CharField(
+        'Состояние', max_length=16, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    error = models.TextField('Ошибка', blank=True)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('created_at',),
+                name='task_pending_idx',
+                condition=models.Q(status='pending')),
+            models.Index(
+                fields=('updated_at',),
+                name='task_running_idx',
+                condition=models.Q(status='running')),
+        )
+
+    def __str__(self):
+        return f'{self.name}{tuple(self.args)}'
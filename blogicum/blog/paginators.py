@@ -0,0 +1,218 @@
+import base64
+import json
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .cache import FEEDS, feed_cache_timeout, versioned_key
+
+
+class WindowedPage(Page):
+    """Страница, которая выводит только окно номеров вокруг текущего."""
+
+    @property
+    def page_range(self):
+        return self.paginator.get_elided_page_range(
+            self.number,
+            on_each_side=settings.PAGINATION_ON_EACH_SIDE,
+            on_ends=1,
+        )
+
+
+class CachedCountPaginator(Paginator):
+    """Пагинатор, кэширующий число объектов ленты.
+
+    Количество считается по ``count_queryset`` — базовому запросу ленты
+    без JOIN для карточек — и хранится в кэше до изменения публикаций
+    или категорий либо до ближайшей из ``scheduled_posts``.
+    """
+
+    def __init__(self, object_list, per_page, count_queryset=None,
+                 cache_key=None, scheduled_posts=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_queryset = count_queryset
+        self.cache_key = cache_key
+        self.scheduled_posts = scheduled_posts
+
+    @cached_property
+    def count(self):
+        if self.cache_key is not None:
+            key = versioned_key(FEEDS, f'count:{self.cache_key}')
+            count = cache.get(key)
+            if count is not None:
+                return count
+        if self.count_queryset is None:
+            count = super().count
+        else:
+            count = self.count_queryset.count()
+        if self.cache_key is not None:
+            timeout = settings.PAGINATION_COUNT_TIMEOUT
+            if self.scheduled_posts is not None:
+                timeout = feed_cache_timeout(
+                    timeout, self.cache_key, self.scheduled_posts)
+            cache.set(key, count, timeout)
+        return count
+
+    def _get_page(self, *args, **kwargs):
+        return WindowedPage(*args, **kwargs)
+
+
+def estimate_count(queryset):
+    """Приблизительное число строк таблицы без полного COUNT.
+
+    PostgreSQL и MySQL берут оценку из статистики таблицы, SQLite —
+    из диапазона rowid. Для других баз возвращает ``None``.
+    """
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s'
+        params = [table]
+    elif connection.vendor == 'mysql':
+        sql = (
+            'SELECT table_rows FROM information_schema.tables'
+            ' WHERE table_schema = DATABASE() AND table_name = %s'
+        )
+        params = [table]
+    elif connection.vendor == 'sqlite':
+        sql = (
+            'SELECT MAX(rowid) - MIN(rowid) + 1'
+            f' FROM {connection.ops.quote_name(table)}'
+        )
+        params = []
+    else:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    return row[0] if row and row[0] and row[0] > 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор, который для больших таблиц не считает строки точно.
+
+    Оценка используется только для запроса без фильтров и только если
+    она не меньше ``ESTIMATED_COUNT_THRESHOLD``; иначе выполняется
+    обычный COUNT.
+    """
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            estimate = estimate_count(self.object_list)
+            if (estimate is not None
+                    and estimate >= settings.ESTIMATED_COUNT_THRESHOLD):
+                return estimate
+        return super().count
+
+
+class CursorPage(Sequence):
+    """Страница ленты, заданная курсором, а не номером."""
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<Cursor page of %s items>' % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset-пагинация: страница выбирается по ключу, без OFFSET и COUNT."""
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+
+    def _fields(self):
+        model_fields = self.object_list.model._meta
+        return [
+            model_fields.get_field(name.lstrip('-')) for name in self.ordering
+        ]
+
+    def encode_cursor(self, obj, reverse=False):
+        values = [field.value_to_string(obj) for field in self._fields()]
+        data = json.dumps([reverse, *values])
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            reverse, *values = json.loads(data)
+            if len(values) != len(self.ordering):
+                raise ValueError
+            values = [
+                field.to_python(value)
+                for field, value in zip(self._fields(), values)
+            ]
+        except (ValueError, TypeError, ValidationError):
+            raise InvalidPage('Некорректный курсор страницы.')
+        return bool(reverse), values
+
+    def _after(self, values, reverse):
+        """Условие «строка идёт после ключа» в порядке обхода."""
+        condition = Q()
+        equal = {}
+        for name, value in zip(self.ordering, values):
+            field = name.lstrip('-')
+            descending = name.startswith('-') != reverse
+            lookup = f'{field}__lt' if descending else f'{field}__gt'
+            condition |= Q(**equal, **{lookup: value})
+            equal[field] = value
+        return condition
+
+    def page(self, cursor=None):
+        reverse, values = (
+            self.decode_cursor(cursor) if cursor else (False, None)
+        )
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(
+                name[1:] if name.startswith('-') else f'-{name}'
+                for name in ordering
+            )
+        queryset = self.object_list.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._after(values, reverse))
+        object_list = list(queryset[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+        if reverse:
+            object_list.reverse()
+        if not object_list:
+            return CursorPage(object_list, self, None, None)
+        has_next = has_more if not reverse else True
+        has_previous = has_more if reverse else values is not None
+        return CursorPage(
+            object_list,
+            self,
+            self.encode_cursor(object_list[-1]) if has_next else None,
+            (
+                self.encode_cursor(object_list[0], reverse=True)
+                if has_previous else None
+            ),
+        )
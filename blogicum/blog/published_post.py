@@ -1,10 +1,53 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.utils.timezone import now
 
 
+def published_filter():
+    return models.Q(
+        is_published=True,
+        pub_date__lt=now(),
+        category__is_published=True)
+
+
+# Поля публикации и связанных моделей, которые выводит карточка в лентах.
+CARD_FIELDS = (
+    'title', 'excerpt', 'image', 'image_widths', 'pub_date', 'is_published',
+    'comment_count', 'updated_at', 'author', 'category', 'location',
+)
+CARD_RELATED_FIELDS = {
+    'author': ('username',),
+    'category': ('title', 'slug', 'is_published', 'updated_at'),
+    'location': ('name', 'is_published', 'updated_at'),
+}
+
+
 class PublishedPostQuerySet(models.QuerySet):
     def published(self):
-        return self.filter(
-            is_published=True,
-            pub_date__lt=now(),
-            category__is_published=True)
+        return self.filter(published_filter())
+
+    def visible_to(self, user):
+        if not user.is_authenticated:
+            return self.published()
+        return self.filter(published_filter() | models.Q(author=user))
+
+    def for_cards(self, *related):
+        """Загружает только поля карточки, без полного текста."""
+        return self.select_related(*related).only(
+            *CARD_FIELDS,
+            *(f'{name}__{field}' for name in related
+              for field in CARD_RELATED_FIELDS[name]),
+        )
+
+    def update_comment_count(self):
+        comments = self.model._meta.get_field('comments').related_model
+        return self.update(comment_count=Coalesce(
+            models.Subquery(
+                comments.objects.filter(post=models.OuterRef('pk'))
+                .order_by()
+                .values('post')
+                .annotate(count=models.Count('pk'))
+                .values('count')
+            ),
+            0
+        ))
@@ -0,0 +1,224 @@
+"""Полнотекстовый поиск по публикациям.
+
+Бэкенд выбирается настройкой ``SEARCH_BACKEND``; по умолчанию для SQLite
+используется индекс FTS5, для остальных баз — поиск через ``LIKE``.
+Индекс хранит все публикации, а правила видимости применяются к
+запросу при поиске. Комментарии индексируются отдельно, каждый своей
+строкой.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import Comment
+from .stemmer import normalize
+
+WORD_RE = re.compile(r'\w+')
+
+
+def get_terms(query):
+    return WORD_RE.findall(query)[:settings.SEARCH_MAX_TERMS]
+
+
+class LikeSearchBackend:
+    """Поиск без индекса: все слова запроса в заголовке или тексте."""
+
+    def index(self, post):
+        pass
+
+    def remove(self, post_id):
+        pass
+
+    def rebuild(self, posts):
+        pass
+
+    def index_comment(self, comment):
+        pass
+
+    def remove_comment(self, comment_id):
+        pass
+
+    def remove_comments(self, comments):
+        pass
+
+    def search_comments(self, queryset, query):
+        for term in get_terms(query):
+            queryset = queryset.filter(
+                Q(text__icontains=term)
+                | Q(author__username=term)
+                | Q(post__title__icontains=term))
+        return queryset
+
+    def search(self, queryset, query):
+        terms = get_terms(query)
+        if not terms:
+            return queryset.none()
+        for term in terms:
+            queryset = queryset.filter(
+                Q(title__icontains=term) | Q(text__icontains=term))
+        return queryset.order_by('-pub_date', '-id')
+
+
+class SQLiteFTSBackend:
+    """Инвертированные индексы FTS5 публикаций и комментариев.
+
+    Строки ``blog_post_fts`` связаны с публикациями, а строки
+    ``blog_comment_fts`` — с комментариями через ``rowid``, поэтому
+    новый комментарий добавляет в индекс одну короткую строку и не
+    затрагивает остальные. В индекс попадают основы слов, и запрос
+    находит любые формы слова. Публикация находится, если все слова
+    запроса есть в её заголовке и тексте или в одном из комментариев.
+    Результаты ранжируются функцией bm25, совпадения в заголовке весят
+    больше, а найденные только по комментариям идут последними.
+    """
+
+    table = 'blog_post_fts'
+    comment_table = 'blog_comment_fts'
+    weights = (10.0, 1.0)
+    batch_size = 500
+
+    def _row(self, post):
+        return (post.pk, normalize(post.title), normalize(post.text))
+
+    def _insert(self, cursor, rows):
+        cursor.executemany(
+            f'INSERT INTO {self.table} (rowid, title, text)'
+            ' VALUES (%s, %s, %s)',
+            rows)
+
+    def _insert_comments(self, cursor, rows):
+        cursor.executemany(
+            f'INSERT INTO {self.comment_table} (rowid, text) VALUES (%s, %s)',
+            ((pk, normalize(text)) for pk, text in rows))
+
+    def index(self, post):
+        with connection.cursor() as cursor:
+            if 'text' in post.get_deferred_fields():
+                # Текст не загружался и не менялся: обновляется заголовок.
+                cursor.execute(
+                    f'UPDATE {self.table} SET title = %s WHERE rowid = %s',
+                    (normalize(post.title), post.pk))
+                return
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE rowid = %s', (post.pk,))
+            self._insert(cursor, [self._row(post)])
+
+    def remove(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE rowid = %s', (post_id,))
+
+    def index_comment(self, comment):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.comment_table} WHERE rowid = %s',
+                (comment.pk,))
+            self._insert_comments(cursor, [(comment.pk, comment.text)])
+
+    def remove_comment(self, comment_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.comment_table} WHERE rowid = %s',
+                (comment_id,))
+
+    def remove_comments(self, comments):
+        """Удаляет из индекса набор комментариев одним запросом."""
+        sql, params = comments.order_by().values('pk').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.comment_table} WHERE rowid IN ({sql})',
+                params)
+
+    def _batches(self, posts):
+        posts = posts.only('title', 'text')
+        last_id = 0
+        while True:
+            batch = list(
+                posts.filter(pk__gt=last_id).order_by('pk')[:self.batch_size])
+            if not batch:
+                return
+            last_id = batch[-1].pk
+            yield [self._row(post) for post in batch]
+
+    def rebuild(self, posts):
+        comments = Comment.objects.filter(post__in=posts).order_by('pk')
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(f'DELETE FROM {self.comment_table}')
+            for rows in self._batches(posts):
+                self._insert(cursor, rows)
+            self._insert_comments(
+                cursor, comments.values_list('pk', 'text').iterator())
+
+    def match_expression(self, terms):
+        # Каждая основа берётся в кавычки, чтобы пользовательский ввод не
+        # разбирался как синтаксис FTS5, и ищется по префиксу.
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def _matching_posts(self, expression):
+        return RawSQL(
+            f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s',
+            (expression,),
+        )
+
+    def _matching_comments(self, expression, column='rowid'):
+        sql = (
+            f'SELECT rowid FROM {self.comment_table}'
+            f' WHERE {self.comment_table} MATCH %s'
+        )
+        if column != 'rowid':
+            sql = (
+                f'SELECT {column} FROM {Comment._meta.db_table}'
+                f' WHERE id IN ({sql})'
+            )
+        return RawSQL(sql, (expression,))
+
+    def search_comments(self, queryset, query):
+        """Ищет комментарии по словам текста, автору и заголовку публикации.
+
+        Текст комментария и заголовок публикации ищутся по индексам FTS5,
+        то есть без учёта регистра и по формам слова, автор — по точному
+        имени пользователя через уникальный индекс.
+        """
+        for word in get_terms(query):
+            condition = Q(author__username=word)
+            stems = normalize(word).split()
+            if stems:
+                match = self.match_expression(stems)
+                condition |= Q(post_id__in=self._matching_posts(
+                    f'title : ({match})'))
+                condition |= Q(pk__in=self._matching_comments(match))
+            queryset = queryset.filter(condition)
+        return queryset
+
+    def search(self, queryset, query):
+        terms = normalize(query).split()[:settings.SEARCH_MAX_TERMS]
+        if not terms:
+            return queryset.none()
+        match = self.match_expression(terms)
+        table = queryset.model._meta.db_table
+        return queryset.filter(
+            Q(pk__in=self._matching_posts(match))
+            | Q(pk__in=self._matching_comments(match, 'post_id'))
+        ).extra(
+            select={'rank': (
+                f'COALESCE((SELECT bm25({self.table}, %s, %s)'
+                f' FROM {self.table} WHERE {self.table} MATCH %s'
+                f' AND rowid = {table}.id), 0)'
+            )},
+            select_params=(*self.weights, match),
+        ).order_by('rank', '-pub_date')
+
+
+def get_backend():
+    path = settings.SEARCH_BACKEND
+    if path is None:
+        return (
+            SQLiteFTSBackend() if connection.vendor == 'sqlite'
+            else LikeSearchBackend()
+        )
+    return import_string(path)()
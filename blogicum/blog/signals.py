@@ -0,0 +1,96 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import FEEDS, PAGES, invalidate
+from .images import delete_image
+from .models import Category, Comment, Location, Post
+from .search import get_backend as get_search_backend
+from .tasks import process_post_image
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_post_feeds(**kwargs):
+    invalidate(FEEDS, PAGES)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_pages(**kwargs):
+    invalidate(PAGES)
+
+
+def release_image(storage, name):
+    """Удаляет файл изображения, если на него не ссылается ни одна публикация.
+
+    Проверка выполняется после фиксации транзакции, чтобы откат не
+    оставил публикацию без файла. Недавно использованный файл может
+    принадлежать ещё не сохранённой публикации, поэтому он остаётся
+    до команды ``delete_orphan_images``.
+    """
+    def delete_orphan():
+        with storage.lock():
+            if (storage.recently_used(name)
+                    or Post.objects.filter(image=name).exists()):
+                return
+            delete_image(storage, name)
+
+    transaction.on_commit(delete_orphan)
+
+
+@receiver(pre_save, sender=Post)
+def detect_image_change(instance, update_fields=None, **kwargs):
+    instance._previous_image = None
+    if update_fields is not None and 'image' not in update_fields:
+        instance._image_changed = False
+        return
+    previous = Post.objects.filter(pk=instance.pk).values_list(
+        'image', flat=True).first() if instance.pk else None
+    instance._previous_image = previous
+    instance._image_changed = (previous or '') != (instance.image.name or '')
+    if instance._image_changed:
+        # Пока копии не готовы, страницы показывают оригинал.
+        instance.image_widths = []
+
+
+@receiver(post_save, sender=Post)
+def process_image_change(instance, **kwargs):
+    if not getattr(instance, '_image_changed', False):
+        return
+    if instance.image:
+        process_post_image.delay(instance.pk)
+    previous = instance._previous_image
+    if previous and previous != instance.image.name:
+        release_image(instance.image.storage, previous)
+
+
+@receiver(post_delete, sender=Post)
+def release_deleted_image(instance, **kwargs):
+    if instance.image:
+        release_image(instance.image.storage, instance.image.name)
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(instance, update_fields=None, **kwargs):
+    if update_fields is None or {'title', 'text'} & set(update_fields):
+        get_search_backend().index(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(instance, **kwargs):
+    get_search_backend().remove(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_search_index(instance, **kwargs):
+    get_search_backend().index_comment(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def remove_comment_from_search_index(instance, **kwargs):
+    get_search_backend().remove_comment(instance.pk)
@@ -0,0 +1,193 @@
+"""Токенизация и стемминг русского текста для поискового индекса.
+
+Стеммер — реализация алгоритма Snowball для русского языка на чистом
+Python. Основы слов запоминаются в словаре терминов: при индексации он
+заполняется словами публикаций и комментариев, и нормализация запроса
+сводится к поиску каждого слова в словаре.
+"""
+import re
+
+VOWELS = 'аеиоуыэюя'
+WORD_RE = re.compile(r'\w+')
+
+PERFECTIVE_GERUND = (
+    ('вшись', 'вши', 'в'),
+    ('ившись', 'ывшись', 'ивши', 'ывши', 'ив', 'ыв'),
+)
+ADJECTIVE = (
+    (),
+    ('ими', 'ыми', 'его', 'ого', 'ему', 'ому', 'ее', 'ие', 'ые', 'ое',
+     'ей', 'ий', 'ый', 'ой', 'ем', 'им', 'ым', 'ом', 'их', 'ых', 'ую',
+     'юю', 'ая', 'яя', 'ою', 'ею'),
+)
+PARTICIPLE = (
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+REFLEXIVE = ((), ('ся', 'сь'))
+VERB = (
+    ('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет',
+     'ют', 'ны', 'ть', 'ешь', 'нно'),
+    ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй',
+     'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят', 'ует', 'уют',
+     'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'),
+)
+NOUN = (
+    (),
+    ('иями', 'ями', 'ами', 'ией', 'иям', 'ием', 'иях', 'ев', 'ов', 'ие',
+     'ье', 'еи', 'ии', 'ей', 'ой', 'ий', 'ям', 'ем', 'ам', 'ом', 'ах', 'ях',
+     'ию', 'ью', 'ия', 'ья', 'а', 'е', 'и', 'й', 'о', 'у', 'ы', 'ь', 'ю',
+     'я'),
+)
+SUPERLATIVE = ((), ('ейше', 'ейш'))
+DERIVATIONAL = ((), ('ость', 'ост'))
+
+# Частые служебные слова не индексируются: они есть почти в каждом
+# тексте и только раздувают списки вхождений.
+STOP_WORDS = frozenset(
+    'а без более бы был была были было быть в вам вас весь во вот все всё'
+    ' всего всех вы где да даже для до его ее её если есть еще ещё же за'
+    ' здесь и из или им их к как ко когда кто ли либо мне может мы на над'
+    ' надо наш не него нее неё нет ни них но ну о об однако он она они оно'
+    ' от очень по под при с со так также такой там те тем то того тоже той'
+    ' только том ты у уже хотя чего чей чем что чтобы чье чья эта эти это'
+    ' я'.split()
+)
+
+
+def _endings(groups):
+    """Окончания группы от длинных к коротким с признаком первой группы.
+
+    Окончания первой группы удаляются, только если перед ними «а» или «я».
+    """
+    first, second = groups
+    return sorted(
+        [(ending, True) for ending in first]
+        + [(ending, False) for ending in second],
+        key=lambda item: -len(item[0]),
+    )
+
+
+PERFECTIVE_GERUND_ENDINGS = _endings(PERFECTIVE_GERUND)
+ADJECTIVE_ENDINGS = _endings(ADJECTIVE)
+PARTICIPLE_ENDINGS = _endings(PARTICIPLE)
+REFLEXIVE_ENDINGS = _endings(REFLEXIVE)
+VERB_ENDINGS = _endings(VERB)
+NOUN_ENDINGS = _endings(NOUN)
+SUPERLATIVE_ENDINGS = _endings(SUPERLATIVE)
+DERIVATIONAL_ENDINGS = _endings(DERIVATIONAL)
+
+
+def _regions(word):
+    """Начала областей RV и R2 алгоритма Snowball."""
+    rv = r1 = r2 = len(word)
+    for index, char in enumerate(word):
+        if char in VOWELS:
+            rv = index + 1
+            break
+    for index in range(1, len(word)):
+        if word[index - 1] in VOWELS and word[index] not in VOWELS:
+            r1 = index + 1
+            break
+    for index in range(r1 + 1, len(word)):
+        if word[index - 1] in VOWELS and word[index] not in VOWELS:
+            r2 = index + 1
+            break
+    return rv, r2
+
+
+def _remove(word, endings, start):
+    """Удаляет самое длинное подходящее окончание, начинающееся не раньше
+    ``start``; возвращает ``None``, если окончание не найдено.
+    """
+    for ending, after_a in endings:
+        if not word.endswith(ending):
+            continue
+        stem = word[:-len(ending)]
+        if len(stem) < start:
+            continue
+        if after_a and not (len(stem) > start and stem[-1] in 'ая'):
+            continue
+        return stem
+    return None
+
+
+def _remove_adjectival(word, start):
+    stem = _remove(word, ADJECTIVE_ENDINGS, start)
+    if stem is None:
+        return None
+    participle = _remove(stem, PARTICIPLE_ENDINGS, start)
+    return stem if participle is None else participle
+
+
+def stem(word):
+    """Основа слова по алгоритму Snowball для русского языка."""
+    word = word.lower().replace('ё', 'е')
+    rv, r2 = _regions(word)
+    stemmed = _remove(word, PERFECTIVE_GERUND_ENDINGS, rv)
+    if stemmed is None:
+        stemmed = _remove(word, REFLEXIVE_ENDINGS, rv) or word
+        for remove in (
+            _remove_adjectival,
+            lambda value, start: _remove(value, VERB_ENDINGS, start),
+            lambda value, start: _remove(value, NOUN_ENDINGS, start),
+        ):
+            result = remove(stemmed, rv)
+            if result is not None:
+                stemmed = result
+                break
+    word = stemmed
+    if word.endswith('и') and len(word) - 1 >= rv:
+        word = word[:-1]
+    word = _remove(word, DERIVATIONAL_ENDINGS, r2) or word
+    if word.endswith('нн') and len(word) - 2 >= rv:
+        return word[:-1]
+    superlative = _remove(word, SUPERLATIVE_ENDINGS, rv)
+    if superlative is not None:
+        word = superlative
+        if word.endswith('нн'):
+            word = word[:-1]
+        return word
+    if word.endswith('ь') and len(word) - 1 >= rv:
+        word = word[:-1]
+    return word
+
+
+class TermDictionary:
+    """Словарь «слово → основа», заполняемый при индексации.
+
+    Стеммер вызывается для каждого слова один раз; размер словаря
+    ограничен ``max_size``, после чего он очищается.
+    """
+
+    def __init__(self, max_size=200_000):
+        self.max_size = max_size
+        self.terms = {}
+
+    def __len__(self):
+        return len(self.terms)
+
+    def __getitem__(self, word):
+        try:
+            return self.terms[word]
+        except KeyError:
+            if len(self.terms) >= self.max_size:
+                self.terms.clear()
+            term = self.terms[word] = stem(word)
+            return term
+
+
+terms = TermDictionary()
+
+
+def tokenize(text):
+    """Слова текста в нижнем регистре без служебных слов."""
+    return [
+        word for word in WORD_RE.findall(text.lower().replace('ё', 'е'))
+        if word not in STOP_WORDS
+    ]
+
+
+def normalize(text, dictionary=terms):
+    """Основы слов текста через пробел — строка для индекса."""
+    return ' '.join(dictionary[word] for word in tokenize(text))
@@ -0,0 +1,86 @@
+import hashlib
+import os
+import re
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+try:
+    import fcntl
+except ImportError:  # Windows: блокировка между процессами недоступна.
+    fcntl = None
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранилище неизменяемых файлов, имена которых задаёт содержимое.
+
+    Загруженный файл сохраняется как ``images/ab/cd/<sha256>.<ext>``.
+    Файл с уже существующим именем не перезаписывается и не получает
+    суффикс: одинаковое имя означает одинаковое содержимое, поэтому
+    сохранённая ранее копия используется повторно. Имена, уже
+    построенные от хеша (в том числе имена уменьшенных копий), не
+    меняются.
+
+    Повторно использованный файл «трогается», и удаление осиротевших
+    файлов пропускает недавно использованные: ссылка на файл из новой
+    публикации появляется в базе только после фиксации транзакции.
+    Проверка и удаление выполняются под той же блокировкой, что и
+    повторное использование.
+    """
+
+    directory = 'images'
+    lock_name = '.images.lock'
+    hashed_name_re = re.compile(
+        r'^images/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}[^/]*$')
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+        content.seek(0)
+        value = digest.hexdigest()
+        extension = os.path.splitext(name)[1].lower()
+        return (
+            f'{self.directory}/{value[:2]}/{value[2:4]}/{value}{extension}')
+
+    def save(self, name, content, max_length=None):
+        if not self.hashed_name_re.match(str(name).replace('\\', '/')):
+            name = self.hashed_name(name, content)
+        return super().save(name, content, max_length)
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    @contextmanager
+    def lock(self):
+        """Блокировка между процессами на проверку и удаление файлов."""
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(self.location, exist_ok=True)
+        with open(os.path.join(self.location, self.lock_name), 'a') as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+    def recently_used(self, name):
+        try:
+            modified = os.path.getmtime(self.path(name))
+        except FileNotFoundError:
+            return False
+        return time.time() - modified < settings.ORPHAN_IMAGE_GRACE_PERIOD
+
+    def _save(self, name, content):
+        with self.lock():
+            if self.exists(name):
+                os.utime(self.path(name))
+                return name
+        return super()._save(name, content)
@@ -0,0 +1,119 @@
+"""Сборка CSS: удаление неиспользуемых правил и минификация."""
+import re
+
+CLASS_RE = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+WORD_RE = re.compile(r'[\w-]+')
+NEGATION_RE = re.compile(r':not\([^)]*\)')
+COMMENT_RE = re.compile(r'/\*(?!!).*?\*/', re.S)
+STRING_RE = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+# @-правила, внутри которых лежат обычные правила и которые чистятся
+# так же, как верхний уровень.
+NESTED_AT_RULES = ('@media', '@supports')
+
+
+def find_words(text):
+    """Все слова, которые могут быть именами CSS-классов."""
+    return set(WORD_RE.findall(text))
+
+
+def _split(text, separator):
+    """Делит текст по разделителю вне скобок и строк."""
+    parts, depth, quote, start = [], 0, None, 0
+    for index, char in enumerate(text):
+        if quote:
+            if char == quote and text[index - 1] != '\\':
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:index])
+            start = index + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _skip_to(css, index, stops):
+    """Индекс первого символа из ``stops`` вне строк, начиная с ``index``."""
+    quote = None
+    while index < len(css):
+        char = css[index]
+        if quote:
+            if char == quote and css[index - 1] != '\\':
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char in stops:
+            return index
+        index += 1
+    return index
+
+
+def _blocks(css):
+    """Разбирает CSS на пары (заголовок, тело) верхнего уровня.
+
+    Для правил без тела, например ``@charset``, тело равно ``None``.
+    """
+    index, length = 0, len(css)
+    while index < length:
+        end = _skip_to(css, index, '{;')
+        prelude = css[index:end].strip()
+        if end >= length or css[end] == ';':
+            if prelude:
+                yield prelude, None
+            index = end + 1
+            continue
+        depth, cursor = 1, end + 1
+        while depth and cursor < length:
+            cursor = _skip_to(css, cursor, '{}')
+            if cursor < length:
+                depth += 1 if css[cursor] == '{' else -1
+                cursor += 1
+        yield prelude, css[end + 1:cursor - 1]
+        index = cursor
+
+
+def _selector_classes(selector):
+    # Классы внутри :not() не обязаны встречаться в разметке.
+    return set(CLASS_RE.findall(NEGATION_RE.sub('', selector)))
+
+
+def _minify(text):
+    parts = STRING_RE.split(text.strip())
+    for index in range(0, len(parts), 2):
+        part = re.sub(r'\s+', ' ', parts[index])
+        parts[index] = re.sub(r'\s*([{};,>])\s*', r'\1', part)
+    return ''.join(parts).rstrip(';')
+
+
+def purge(css, used_words):
+    """Оставляет правила, все классы селекторов которых встречаются в
+    ``used_words``, и возвращает минифицированный CSS.
+    """
+    output = []
+    for prelude, body in _blocks(COMMENT_RE.sub('', css)):
+        if prelude.startswith('/*!'):
+            # Лицензионный комментарий идёт перед первым правилом.
+            banner, _, prelude = prelude.partition('*/')
+            output.append(banner + '*/')
+            prelude = prelude.strip()
+        if body is None:
+            output.append(prelude + ';')
+        elif prelude.startswith(NESTED_AT_RULES):
+            nested = purge(body, used_words)
+            if nested:
+                output.append(f'{_minify(prelude)}{{{nested}}}')
+        elif prelude.startswith('@'):
+            output.append(f'{_minify(prelude)}{{{_minify(body)}}}')
+        else:
+            selectors = [
+                selector.strip() for selector in _split(prelude, ',')
+                if _selector_classes(selector) <= used_words
+            ]
+            if selectors:
+                output.append(
+                    f'{",".join(map(_minify, selectors))}{{{_minify(body)}}}')
+    return ''.join(output)
@@ -0,0 +1,116 @@
+"""Фоновые задачи и очередь для их выполнения.
+
+Функция, помеченная ``@task``, получает метод ``delay()``: вызов ставит
+задачу в очередь бэкенда из ``settings.TASK_BACKEND``. Бэкенд по
+умолчанию сохраняет задачу в таблицу ``Task``, откуда её забирает
+команда ``process_tasks``; ``ImmediateBackend`` выполняет задачу сразу.
+
+Задача с ошибкой возвращается в очередь, пока число попыток не достигнет
+``TASK_MAX_ATTEMPTS``. Задача, которая дольше ``TASK_TIMEOUT`` секунд
+числится выполняемой, считается брошенной упавшим обработчиком и тоже
+возвращается в очередь.
+"""
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+DEFAULT_BACKEND = 'blog.tasks.DatabaseBackend'
+
+registry = {}
+
+
+def task(func):
+    """Регистрирует функцию как фоновую задачу."""
+    name = f'{func.__module__}.{func.__name__}'
+    registry[name] = func
+    func.task_name = name
+    func.delay = lambda *args: get_backend().enqueue(name, args)
+    return func
+
+
+def get_backend():
+    path = getattr(settings, 'TASK_BACKEND', DEFAULT_BACKEND)
+    return import_string(path)()
+
+
+class ImmediateBackend:
+    """Выполняет задачу в момент постановки в очередь."""
+
+    def enqueue(self, name, args):
+        registry[name](*args)
+
+
+class DatabaseBackend:
+    """Хранит очередь в базе данных проекта."""
+
+    def enqueue(self, name, args):
+        from .models import Task
+        return Task.objects.create(name=name, args=list(args))
+
+
+def requeue_stale_tasks():
+    """Возвращает в очередь задачи, брошенные упавшим обработчиком.
+
+    Задачи, исчерпавшие попытки, помечаются как завершённые с ошибкой.
+    """
+    from .models import Task
+    now = timezone.now()
+    stale = Task.objects.filter(
+        status=Task.RUNNING,
+        updated_at__lt=now - timedelta(seconds=settings.TASK_TIMEOUT))
+    stale.filter(attempts__gte=settings.TASK_MAX_ATTEMPTS).update(
+        status=Task.FAILED,
+        error='Обработчик не завершил задачу за отведённое время.',
+        updated_at=now)
+    return stale.update(status=Task.PENDING, updated_at=now)
+
+
+def claim_tasks(limit):
+    """Забирает из очереди до ``limit`` задач и помечает их как начатые.
+
+    Задача достаётся только тому обработчику, чей условный UPDATE
+    перевёл её из состояния «в очереди», поэтому несколько запущенных
+    обработчиков не выполняют одну задачу дважды.
+    """
+    from .models import Task
+    requeue_stale_tasks()
+    pending = Task.objects.filter(status=Task.PENDING)
+    claimed = []
+    for pk in pending.values_list('pk', flat=True)[:limit]:
+        if pending.filter(pk=pk).update(
+            status=Task.RUNNING, attempts=F('attempts') + 1,
+            updated_at=timezone.now(),
+        ):
+            claimed.append(pk)
+    return claimed
+
+
+def execute_task(pk):
+    """Выполняет задачу из очереди и сохраняет результат."""
+    from .models import Task
+    task = Task.objects.get(pk=pk)
+    try:
+        registry[task.name](*task.args)
+    except Exception:
+        task.status = (
+            Task.PENDING if task.attempts < settings.TASK_MAX_ATTEMPTS
+            else Task.FAILED)
+        task.error = traceback.format_exc()
+    else:
+        task.status = Task.DONE
+        task.error = ''
+    task.save(update_fields=('status', 'error', 'updated_at'))
+    return task.status
+
+
+@task
+def process_post_image(post_id):
+    """Создаёт уменьшенные копии изображения публикации."""
+    from .models import Post
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None:
+        post.update_image_derivatives()
@@ -0,0 +1,26 @@
+from functools import lru_cache
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django_bootstrap5.templatetags.django_bootstrap5 import bootstrap_css
+
+register = template.Library()
+
+
+@lru_cache(maxsize=None)
+def _is_built(path):
+    # Поиск обходит статические каталоги всех приложений, поэтому
+    # выполняется один раз на процесс, а не при каждой отрисовке.
+    return finders.find(path) is not None
+
+
+@register.simple_tag
+def site_css():
+    """Подключает собранный CSS сайта или, если его нет, Bootstrap из CDN."""
+    if _is_built(settings.SITE_CSS):
+        return format_html(
+            '<link rel="stylesheet" href="{}">', static(settings.SITE_CSS))
+    return bootstrap_css()
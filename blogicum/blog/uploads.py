@@ -0,0 +1,48 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+
+class OversizedUploadedFile(UploadedFile):
+    """Файл, отброшенный при загрузке из-за превышения размера.
+
+    Содержимое не сохраняется; ``size`` — число полученных байт, чтобы
+    форма могла сообщить пользователю об ошибке.
+    """
+
+    def __init__(self, name, content_type, size):
+        super().__init__(BytesIO(), name, content_type, size)
+
+
+class SizeLimitedUploadHandler(TemporaryFileUploadHandler):
+    """Записывает загружаемые файлы на диск, ограничивая их размер.
+
+    Данные сверх ``settings.UPLOAD_MAX_FILE_SIZE`` не сохраняются:
+    временный файл удаляется, а вместо него форма получает
+    ``OversizedUploadedFile``.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.oversized = (
+            self.content_length is not None
+            and self.content_length > settings.UPLOAD_MAX_FILE_SIZE
+        )
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.UPLOAD_MAX_FILE_SIZE:
+            self.oversized = True
+        if self.oversized:
+            return None
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if self.oversized:
+            self.file.close()
+            return OversizedUploadedFile(
+                self.file_name, self.content_type, self.received)
+        return super().file_complete(file_size)
@@ -23,6 +23,9 @@ urlpatterns = [
     path('posts/<int:post_id>/delete/',
          views.PostDeleteView.as_view(),
          name='delete_post'),
+    path('posts/<int:post_id>/comments/',
+         views.CommentListView.as_view(),
+         name='comments'),
     path('posts/<int:post_id>/comment/',
          views.CommentCreateView.as_view(),
          name='add_comment'),
@@ -32,6 +35,9 @@ urlpatterns = [
     path('posts/<int:post_id>/edit_comment/<int:comment_id>',
          views.CommentUpdateView.as_view(),
          name='edit_comment'),
+    path('search/',
+         views.SearchView.as_view(),
+         name='search'),
     path('edit_profile/', views.EditProfile.as_view(),
          name='edit_profile'),
     path('profile/<slug:username>/',
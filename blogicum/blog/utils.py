@@ -1,25 +1,21 @@
-from django.db.models import Count
+from django.conf import settings
 from django.utils import timezone
 
 from .models import Post
+from .paginators import CursorPaginator
 
 
 def get_available_posts(
     posts=Post.objects,
     filter_published=True,
     selected_related=True,
-    comment_count=True
 ):
     if selected_related:
-        posts = posts.select_related(
+        posts = posts.for_cards(
             'location',
             'author',
             'category',
         )
-    if comment_count:
-        posts = posts.annotate(comment_count=Count('comments')).order_by(
-            *posts.model._meta.ordering
-        )
     if filter_published:
         posts = posts.filter(
             pub_date__lte=timezone.now(),
@@ -27,3 +23,19 @@ def get_available_posts(
             category__is_published=True
         )
     return posts
+
+
+def get_scheduled_posts(posts=Post.objects):
+    return posts.filter(
+        pub_date__gt=timezone.now(),
+        is_published=True,
+        category__is_published=True
+    )
+
+
+def get_comments_page(post, cursor=None):
+    return CursorPaginator(
+        post.comments.select_related('author'),
+        settings.COMMENTS_PAGINATION,
+        ordering=('created_at', 'id'),
+    ).page(cursor)
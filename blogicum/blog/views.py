@@ -1,35 +1,46 @@
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import User
+from django.core.paginator import InvalidPage
+from django.db import transaction
+from django.db.models import F
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.views.generic import (
     CreateView, UpdateView, DeleteView, DetailView, ListView)
 from django.views.generic.edit import FormMixin
 from django.urls import reverse, reverse_lazy
-from django.utils import timezone
-from django.db.models import Count
+from django.utils.http import urlencode
 from .forms import PostForm, CommentForm
-from .models import Post, Category
-from .published_post import PublishedPostQuerySet
-from .utils import get_available_posts
+from .models import Category, Post
+from .paginators import CachedCountPaginator
+from .search import get_backend as get_search_backend
+from .utils import (
+    get_available_posts, get_comments_page, get_scheduled_posts)
 from .mixins import (
     OnlyAuthorMixin, CommentEditMixin,
-    BackToProfileMixin, CommentPkMixin)
+    BackToProfileMixin, CommentPkMixin, AnonymousPageCacheMixin,
+    CachedCountPaginationMixin, CursorPaginationMixin)
 
 # Посты
 
 
-class Index(ListView):
+class Index(AnonymousPageCacheMixin, CursorPaginationMixin,
+            CachedCountPaginationMixin, ListView):
     paginate_by = settings.PAGINATION
     template_name = 'blog/index.html'
 
     def get_queryset(self):
-        now = timezone.now()
-        return Post.objects.filter(
-            is_published=True,
-            pub_date__lte=now,
-            category__is_published=True
-        ).annotate(comment_count=Count('comments')).order_by('-pub_date')
+        return get_available_posts()
+
+    def get_count_queryset(self):
+        return get_available_posts(selected_related=False)
+
+    def get_feed_key(self):
+        return 'index'
+
+    def get_scheduled_posts(self):
+        return get_scheduled_posts()
 
 
 class PostCreateView(LoginRequiredMixin, BackToProfileMixin, CreateView):
@@ -81,30 +92,46 @@ class PostDeleteView(
         )
 
 
-class PostDetailView(FormMixin, DetailView):
+class PostDetailView(AnonymousPageCacheMixin, FormMixin, DetailView):
     model = Post
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
 
-    def get_object(self):
-        post = super().get_object()
-        if post.author == self.request.user:
-            return post
-
-        return get_object_or_404(
-            PublishedPostQuerySet(Post).published(),
-            id=post.id
+    def get_queryset(self):
+        return (
+            Post.objects.visible_to(self.request.user)
+            .select_related('author', 'category', 'location')
         )
 
     def get_context_data(self, **kwargs):
+        try:
+            comments = get_comments_page(
+                self.object, self.request.GET.get('cursor'))
+        except InvalidPage as error:
+            raise Http404(str(error))
         return super().get_context_data(
-            **kwargs,
-            form=CommentForm(),
-            comments=self.object.comments.select_related('author'))
+            **kwargs, form=CommentForm(), comments=comments)
 
 # Комментарии
 
 
+class CommentListView(AnonymousPageCacheMixin, DetailView):
+    model = Post
+    template_name = 'includes/comment_list.html'
+    pk_url_kwarg = 'post_id'
+
+    def get_queryset(self):
+        return Post.objects.visible_to(self.request.user)
+
+    def get_context_data(self, **kwargs):
+        try:
+            comments = get_comments_page(
+                self.object, self.request.GET.get('cursor'))
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return super().get_context_data(**kwargs, comments=comments)
+
+
 class CommentCreateView(LoginRequiredMixin,
                         CommentEditMixin, PostEditMixin, CreateView):
 
@@ -117,13 +144,23 @@ class CommentCreateView(LoginRequiredMixin,
         if form.is_valid():
             form.instance.author = self.request.user
             form.instance.post = self.post_obj
-        return super().form_valid(form)
+        with transaction.atomic():
+            response = super().form_valid(form)
+            Post.objects.filter(pk=self.post_obj.pk).update(
+                comment_count=F('comment_count') + 1)
+        return response
 
 
 class CommentDeleteView(
     LoginRequiredMixin, OnlyAuthorMixin, CommentPkMixin,
         CommentEditMixin, DeleteView):
-    pass
+
+    def delete(self, request, *args, **kwargs):
+        with transaction.atomic():
+            response = super().delete(request, *args, **kwargs)
+            Post.objects.filter(pk=self.object.post_id).update(
+                comment_count=F('comment_count') - 1)
+        return response
 
 
 class CommentUpdateView(
@@ -134,7 +171,8 @@ class CommentUpdateView(
 # Профиль
 
 
-class Profile(ListView):
+class Profile(CursorPaginationMixin, CachedCountPaginationMixin,
+              ListView):
     template_name = 'blog/profile.html'
     paginate_by = settings.PAGINATION
 
@@ -143,9 +181,26 @@ class Profile(ListView):
             User,
             username=self.kwargs['username']
         )
+        self.filter_published = self.request.user != self.author
+        return get_available_posts(
+            self.author.posts,
+            filter_published=self.filter_published,
+            selected_related=False
+        ).for_cards('location', 'category')
+
+    def get_count_queryset(self):
         return get_available_posts(
-            filter_published=self.request.user != self.author,
-            selected_related=False).filter(author=self.author.id)
+            self.author.posts,
+            filter_published=self.filter_published,
+            selected_related=False)
+
+    def get_feed_key(self):
+        return f'profile:{self.author.pk}:{self.filter_published}'
+
+    def get_scheduled_posts(self):
+        if self.filter_published:
+            return get_scheduled_posts(self.author.posts)
+        return None
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -162,7 +217,8 @@ class EditProfile(LoginRequiredMixin, BackToProfileMixin, UpdateView):
         return self.request.user
 
 
-class CategoryView(ListView):
+class CategoryView(AnonymousPageCacheMixin, CursorPaginationMixin,
+                   CachedCountPaginationMixin, ListView):
 
     template_name = 'blog/category.html'
     paginate_by = settings.PAGINATION
@@ -172,9 +228,41 @@ class CategoryView(ListView):
                 .filter(category__slug=self.kwargs['category_slug'])
                 )
 
+    def get_count_queryset(self):
+        return (get_available_posts(selected_related=False)
+                .filter(category__slug=self.kwargs['category_slug'])
+                )
+
+    def get_feed_key(self):
+        return f'category:{self.kwargs["category_slug"]}'
+
+    def get_scheduled_posts(self):
+        return get_scheduled_posts().filter(
+            category__slug=self.kwargs['category_slug'])
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["category"] = get_object_or_404(
             Category, is_published=True, slug=self.kwargs["category_slug"]
         )
         return context
+
+
+class SearchView(ListView):
+    template_name = 'blog/search.html'
+    paginate_by = settings.PAGINATION
+    paginator_class = CachedCountPaginator
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        return get_search_backend().search(
+            Post.objects.published().for_cards(
+                'location', 'author', 'category'),
+            self.query,
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        context['query_string'] = urlencode({'q': self.query}) + '&'
+        return context
@@ -78,6 +78,12 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -116,6 +122,26 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
+STATIC_ROOT = BASE_DIR / 'static_root'
+# Имена с хешем содержимого и сжатые копии (gzip, Brotli при установленном
+# пакете brotli) создаются командой collectstatic.
+STATICFILES_STORAGE = 'blogicum.staticfiles.CompressedManifestStaticFilesStorage'
+# CSS сайта, собранный из Bootstrap командой build_css. Пока файла нет,
+# подключается Bootstrap из CDN.
+SITE_CSS = 'css/site.min.css'
+# Бэкенд поиска по публикациям; None — FTS5 для SQLite, иначе LIKE.
+SEARCH_BACKEND = None
+SEARCH_MAX_TERMS = 10
+# Каталог страниц, заранее отрисованных командой prerender_pages.
+PRERENDERED_PAGES_DIR = BASE_DIR / 'prerendered'
+# Страницы ошибок отрисовываются один раз и хранятся в кэше.
+ERROR_PAGE_CACHE_TIMEOUT = 60 * 60
+# Клиент, получивший больше NOT_FOUND_LIMIT ответов 404 за NOT_FOUND_WINDOW
+# секунд, получает короткий ответ без отрисовки страницы.
+NOT_FOUND_LIMIT = 30
+NOT_FOUND_WINDOW = 60
+# Раздавать собранную статику из STATIC_ROOT самим приложением.
+SERVE_STATIC = True
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
@@ -136,10 +162,43 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 MEDIA_URL = '/media/'
 
+POST_IMAGE_WIDTHS = (320, 640, 960)
+
+# Число слов в анонсе публикации на карточках лент.
+POST_EXCERPT_WORDS = 10
+
+# Загружаемые файлы пишутся на диск; данные сверх лимита отбрасываются.
+FILE_UPLOAD_HANDLERS = ['blog.uploads.SizeLimitedUploadHandler']
+UPLOAD_MAX_FILE_SIZE = 10 * 1024 * 1024
+# Изображения с большим числом пикселей отклоняются до декодирования.
+POST_IMAGE_MAX_PIXELS = 40_000_000
+# Файл изображения, использованный позже этого числа секунд назад, не
+# удаляется как осиротевший: его может ждать ещё не сохранённая публикация.
+ORPHAN_IMAGE_GRACE_PERIOD = 10 * 60
+
+# Очередь фоновых задач: blog.tasks.DatabaseBackend или ImmediateBackend.
+TASK_BACKEND = 'blog.tasks.DatabaseBackend'
+# Число попыток выполнить задачу и время в секундах, после которого
+# начатая, но не завершённая задача возвращается в очередь.
+TASK_MAX_ATTEMPTS = 3
+TASK_TIMEOUT = 600
+
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 PAGINATION = 10
 
+COMMENTS_PAGINATION = 10
+
+CURSOR_PAGINATION = False
+
+PAGINATION_ON_EACH_SIDE = 2
+
+PAGINATION_COUNT_TIMEOUT = 60 * 15
+# Начиная с такого числа строк, админка показывает оценку количества.
+ESTIMATED_COUNT_THRESHOLD = 10_000
+
+PAGE_CACHE_TIMEOUT = 60 * 5
+
 TEMPLATES_DIR = BASE_DIR / 'templates'
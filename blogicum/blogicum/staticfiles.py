@@ -0,0 +1,128 @@
+"""Хранилище и раздача статики с хешами в именах и сжатыми копиями."""
+import gzip
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен: без него создаются только .gz
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.map', '.svg', '.ico', '.txt', '.json', '.xml', '.html',
+)
+# Сжатые копии: расширение файла и значение Content-Encoding.
+ENCODINGS = (('.br', 'br'), ('.gz', 'gzip'))
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+
+
+def _compress_gzip(data):
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _compress_brotli(data):
+    return brotli.compress(data, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хешем содержимого в имени и сжатыми копиями файлов.
+
+    При ``collectstatic`` рядом с текстовыми файлами сохраняются копии
+    в gzip и, если установлен пакет ``brotli``, в Brotli. Если файл не
+    собран — например, в разработке или в тестах, — ``url()`` отдаёт
+    исходное имя вместо ошибки.
+    """
+
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed = super().post_process(paths, dry_run=dry_run, **options)
+        for name, hashed_name, processed_file in processed:
+            if (not dry_run and hashed_name
+                    and not isinstance(processed_file, Exception)):
+                self.compress(hashed_name)
+            yield name, hashed_name, processed_file
+
+    def compress(self, name):
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+            return
+        with self.open(name) as file:
+            data = file.read()
+        compressors = [('.gz', _compress_gzip)]
+        if brotli is not None:
+            compressors.append(('.br', _compress_brotli))
+        for extension, compress in compressors:
+            compressed = compress(data)
+            if len(compressed) >= len(data):
+                continue
+            path = self.path(name + extension)
+            with open(path, 'wb') as file:
+                file.write(compressed)
+
+
+def _accepted_encodings(request):
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    return {
+        value.split(';')[0].strip().lower() for value in header.split(',')
+    }
+
+
+@require_safe
+def serve(request, path):
+    """Отдаёт собранную статику из ``STATIC_ROOT``.
+
+    Файлы с хешем в имени не меняются, поэтому кэшируются браузером на
+    год без перепроверки. Если клиент принимает сжатие, отдаётся
+    заранее сжатая копия файла.
+    """
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, path)
+    except ValueError:
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+    modified = os.stat(fullpath).st_mtime
+    if not was_modified_since(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'), modified):
+        return HttpResponseNotModified()
+    content_type, _ = mimetypes.guess_type(fullpath)
+    accepted = _accepted_encodings(request)
+    encoding = None
+    for extension, name in ENCODINGS:
+        if name in accepted and os.path.isfile(fullpath + extension):
+            fullpath, encoding = fullpath + extension, name
+            break
+    response = FileResponse(
+        open(fullpath, 'rb'),
+        content_type=content_type or 'application/octet-stream',
+    )
+    response['Last-Modified'] = http_date(modified)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    if path.endswith(COMPRESSIBLE_EXTENSIONS):
+        patch_vary_headers(response, ('Accept-Encoding',))
+    if HASHED_NAME_RE.search(path):
+        patch_cache_control(
+            response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
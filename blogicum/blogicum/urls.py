@@ -1,9 +1,13 @@
+import re
+
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.contrib.auth.forms import UserCreationForm
 from django.views.generic import CreateView
-from django.urls import include, path, reverse_lazy
+from django.urls import include, path, re_path, reverse_lazy
+
+from .staticfiles import serve as serve_static
 
 handler403 = "pages.views.csrf_failure"
 handler404 = "pages.views.page_not_found"
@@ -24,6 +28,13 @@ urlpatterns = [
          ),
 ]
 
+if settings.SERVE_STATIC and not settings.DEBUG:
+    # В режиме отладки статику раздаёт django.contrib.staticfiles.
+    urlpatterns.append(re_path(
+        r'^%s(?P<path>.*)$' % re.escape(settings.STATIC_URL.lstrip('/')),
+        serve_static,
+    ))
+
 if settings.DEBUG:
     urlpatterns += static(
         settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
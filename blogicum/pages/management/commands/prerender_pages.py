@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from pages.prerender import ANONYMOUS, AUTHENTICATED, page_path, render_page
+from pages.views import About, Rules
+
+PAGES = {'about': About, 'rules': Rules}
+
+
+class Command(BaseCommand):
+    help = (
+        'Отрисовывает статические страницы в файлы. Запускается при'
+        ' выкладке, после collectstatic.'
+    )
+
+    def handle(self, *args, **options):
+        for url_name, view_class in PAGES.items():
+            for variant in (ANONYMOUS, AUTHENTICATED):
+                path = page_path(url_name, variant)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(render_page(view_class, url_name, variant))
+                self.stdout.write(f'{path}')
+        self.stdout.write(self.style.SUCCESS('Страницы отрисованы.'))
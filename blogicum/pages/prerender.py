@@ -0,0 +1,107 @@
+"""Страницы, отрисованные заранее: статические страницы и страницы ошибок.
+
+Шапка сайта зависит только от того, вошёл ли пользователь, поэтому для
+каждой страницы хранятся два варианта. В варианте для авторизованных
+вместо имени пользователя стоит ``USERNAME_PLACEHOLDER``, а на
+страницах ошибок вместо адреса запроса — ``URL_PLACEHOLDER``; они
+подставляются при ответе.
+"""
+import hashlib
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from django.utils.html import escape
+
+ANONYMOUS = 'anonymous'
+AUTHENTICATED = 'authenticated'
+USERNAME_PLACEHOLDER = 'prerendered-username-placeholder'
+URL_PLACEHOLDER = 'prerendered-url-placeholder'
+
+
+class PlaceholderUser(AnonymousUser):
+    """Пользователь-заглушка для отрисовки варианта для авторизованных."""
+
+    username = USERNAME_PLACEHOLDER
+
+    @property
+    def is_anonymous(self):
+        return False
+
+    @property
+    def is_authenticated(self):
+        return True
+
+
+def page_path(url_name, variant):
+    return Path(settings.PRERENDERED_PAGES_DIR) / f'{url_name}.{variant}.html'
+
+
+def render_page(view_class, url_name, variant):
+    """Отрисовывает страницу так, как её отдаёт представление."""
+    path = reverse(f'pages:{url_name}')
+    request = RequestFactory().get(path)
+    request.resolver_match = resolve(path)
+    request.user = (
+        PlaceholderUser() if variant == AUTHENTICATED else AnonymousUser())
+    response = view_class.as_view(use_prerendered=False)(request)
+    return response.render().content
+
+
+def get_variant(user):
+    if user is not None and user.is_authenticated:
+        return AUTHENTICATED
+    return ANONYMOUS
+
+
+def personalize(content, user):
+    """Подставляет имя пользователя в вариант для авторизованных."""
+    if get_variant(user) == ANONYMOUS:
+        return content
+    placeholder_url = reverse('blog:profile', args=[USERNAME_PLACEHOLDER])
+    return content.replace(
+        placeholder_url.encode(),
+        reverse('blog:profile', args=[user.username]).encode(),
+    ).replace(USERNAME_PLACEHOLDER.encode(), escape(user.username).encode())
+
+
+def load_page(url_name, user):
+    """Возвращает тело страницы для пользователя и её ETag.
+
+    Если страница не отрисована, возвращает ``(None, None)``.
+    """
+    try:
+        content = page_path(url_name, get_variant(user)).read_bytes()
+    except FileNotFoundError:
+        return None, None
+    content = personalize(content, user)
+    return content, f'"{hashlib.md5(content).hexdigest()}"'
+
+
+def render_error_page(template_name, request, user=None):
+    """Возвращает тело страницы ошибки из кэша, отрисовывая его один раз.
+
+    Без пользователя отдаётся вариант для анонимных посетителей.
+    """
+    variant = get_variant(user)
+    key = f'error_page:{template_name}:{variant}'
+    content = cache.get(key)
+    if content is None:
+        placeholder_request = RequestFactory().get('/')
+        placeholder_request.build_absolute_uri = (
+            lambda location=None: URL_PLACEHOLDER)
+        placeholder_request.user = (
+            PlaceholderUser() if variant == AUTHENTICATED
+            else AnonymousUser())
+        content = render_to_string(
+            template_name, request=placeholder_request).encode()
+        cache.set(key, content, settings.ERROR_PAGE_CACHE_TIMEOUT)
+    if URL_PLACEHOLDER.encode() in content:
+        content = content.replace(
+            URL_PLACEHOLDER.encode(),
+            escape(request.build_absolute_uri()).encode())
+    return personalize(content, user)
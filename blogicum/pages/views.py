@@ -1,23 +1,86 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotFound
+from django.utils.cache import get_conditional_response, patch_vary_headers
 from django.views.generic import TemplateView
-from django.shortcuts import render
 
+from .prerender import load_page, render_error_page
 
-class About(TemplateView):
+FALLBACK_ERROR_PAGE = (
+    '<!DOCTYPE html><html lang="ru"><head><meta charset="utf-8">'
+    '<title>Ошибка {status}</title></head><body><h1>Ошибка {status}</h1>'
+    '<a href="/">Вернуться на главную</a></body></html>'
+)
+
+
+class PrerenderedPageMixin:
+    """Отдаёт заранее отрисованную страницу без шаблонизатора.
+
+    Файлы создаёт команда ``prerender_pages``; пока их нет, страница
+    отрисовывается как обычно.
+    """
+
+    url_name = None
+    use_prerendered = True
+
+    def get(self, request, *args, **kwargs):
+        content, etag = (
+            load_page(self.url_name, request.user)
+            if self.use_prerendered else (None, None)
+        )
+        if content is None:
+            return super().get(request, *args, **kwargs)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(content)
+        response['ETag'] = etag
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+
+class About(PrerenderedPageMixin, TemplateView):
     template_name = 'pages/about.html'
+    url_name = 'about'
 
 
-class Rules(TemplateView):
+class Rules(PrerenderedPageMixin, TemplateView):
     template_name = 'pages/rules.html'
+    url_name = 'rules'
+
+
+def error_response(request, template_name, status, with_user=True):
+    """Страница ошибки из кэша; при сбое — HTML без шаблонов и базы."""
+    user = getattr(request, 'user', None) if with_user else None
+    try:
+        content = render_error_page(template_name, request, user)
+    except Exception:
+        content = FALLBACK_ERROR_PAGE.format(status=status)
+    return HttpResponse(content, status=status)
+
+
+def too_many_not_found(request):
+    """Считает ответы 404 для адреса клиента за окно ``NOT_FOUND_WINDOW``."""
+    key = f'not_found:{request.META.get("REMOTE_ADDR", "")}'
+    cache.add(key, 0, settings.NOT_FOUND_WINDOW)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        return False
+    return count > settings.NOT_FOUND_LIMIT
 
 
 def csrf_failure(request, reason='', **kwargs):
-    return render(request, 'pages/403csrf.html', status=403)
+    return error_response(request, 'pages/403csrf.html', 403)
 
 
 def page_not_found(request, exception):
-    return render(request, 'pages/404.html', status=404)
+    if too_many_not_found(request):
+        # Сканерам, перебирающим адреса, страница не отрисовывается.
+        return HttpResponseNotFound(
+            'Страница не найдена', content_type='text/plain; charset=utf-8')
+    return error_response(request, 'pages/404.html', 404)
 
 
 def server_error(request):
-    return render(request, 'pages/500.html', status=500)
+    # Пользователь не загружается: ошибка может быть вызвана базой.
+    return error_response(request, 'pages/500.html', 500, with_user=False)
@@ -0,0 +1,26 @@
+// Подгружает следующую страницу комментариев на место ссылки
+// «Показать ещё комментарии». Без JavaScript ссылка открывает страницу
+// публикации с этой страницей комментариев.
+document.addEventListener('click', function (event) {
+  const link = event.target.closest('a[data-comments-url]');
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  fetch(link.dataset.commentsUrl, {
+    headers: {'X-Requested-With': 'XMLHttpRequest'},
+  })
+    .then(function (response) {
+      if (!response.ok) {
+        throw new Error(response.statusText);
+      }
+      return response.text();
+    })
+    .then(function (html) {
+      link.insertAdjacentHTML('beforebegin', html);
+      link.remove();
+    })
+    .catch(function () {
+      window.location.href = link.href;
+    });
+});
@@ -0,0 +1,153 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from blog.models import Comment, Post
+from blog.search import get_backend as get_search_backend
+
+pytestmark = [pytest.mark.django_db]
+
+POST_CHANGELIST_MAX_QUERIES = 8
+
+
+def test_post_changelist_queries(
+    mixer: Mixer, admin_client, published_category, published_location
+):
+    text = "Очень длинный текст публикации. " * 100
+    mixer.cycle(30).blend(
+        "blog.Post",
+        category=published_category,
+        location=published_location,
+        text=text,
+    )
+    with CaptureQueriesContext(connection) as context:
+        response = admin_client.get("/admin/blog/post/")
+    assert response.status_code == 200
+    assert len(context.captured_queries) <= POST_CHANGELIST_MAX_QUERIES, (
+        "Убедитесь, что список публикаций в админке загружается"
+        " фиксированным числом запросов."
+    )
+    post_queries = [
+        query["sql"] for query in context.captured_queries
+        if query["sql"].startswith('SELECT "blog_post"."id"')
+    ]
+    assert post_queries
+    assert all(' "blog_post"."text",' not in sql for sql in post_queries), (
+        "Убедитесь, что список публикаций не загружает полный текст."
+    )
+    content = response.content.decode("utf-8")
+    assert f"{text[:50]}…" in content
+    assert f'<option value="{published_category.id}" selected>' in content
+
+
+def test_post_changelist_estimated_count(
+    mixer: Mixer, admin_client, published_category, settings
+):
+    settings.ESTIMATED_COUNT_THRESHOLD = 3
+    posts = mixer.cycle(5).blend("blog.Post", category=published_category)
+    posts[2].delete()
+    response = admin_client.get("/admin/blog/post/")
+    assert response.context["cl"].result_count == 5, (
+        "Убедитесь, что для больших таблиц админка использует оценку"
+        " количества строк."
+    )
+    response = admin_client.get("/admin/blog/post/", {"q": "a"})
+    assert response.context["cl"].result_count <= 4
+
+
+COMMENT_CHANGELIST_MAX_QUERIES = 8
+
+
+def test_comment_changelist_queries(
+    mixer: Mixer, admin_client, post_with_published_location
+):
+    mixer.cycle(30).blend("blog.Comment", post=post_with_published_location)
+    with CaptureQueriesContext(connection) as context:
+        response = admin_client.get("/admin/blog/comment/")
+    assert response.status_code == 200
+    assert len(context.captured_queries) <= COMMENT_CHANGELIST_MAX_QUERIES, (
+        "Убедитесь, что список комментариев в админке загружает авторов"
+        " и публикации вместе с комментариями."
+    )
+    assert response.context["cl"].date_hierarchy == "created_at"
+
+
+def test_comment_admin_search(
+    mixer: Mixer, admin_client, user, another_user, published_category
+):
+    post = mixer.blend(
+        "blog.Post", title="Поездка на Байкал", category=published_category)
+    other_post = mixer.blend(
+        "blog.Post", title="Заметка", category=published_category)
+    about_photos = mixer.blend(
+        "blog.Comment", post=other_post, author=another_user,
+        text="Отличные фотографии")
+    by_user = mixer.blend(
+        "blog.Comment", post=other_post, author=user, text="Спасибо")
+    on_post = mixer.blend(
+        "blog.Comment", post=post, author=another_user, text="Красиво")
+
+    def search(query):
+        response = admin_client.get("/admin/blog/comment/", {"q": query})
+        assert response.status_code == 200
+        return set(response.context["cl"].result_list)
+
+    assert search("фотографии") == {about_photos}, (
+        "Убедитесь, что в админке комментарии ищутся по тексту."
+    )
+    assert search("отличные") == search("фотография") == {about_photos}, (
+        "Убедитесь, что в админке комментарии ищутся без учёта регистра"
+        " и по формам слова."
+    )
+    assert search(user.username) == {by_user}, (
+        "Убедитесь, что в админке комментарии ищутся по имени автора."
+    )
+    assert search("Байкал") == {on_post}, (
+        "Убедитесь, что в админке комментарии ищутся по заголовку"
+        " публикации."
+    )
+
+
+def test_comment_admin_bulk_delete(
+    mixer: Mixer, admin_client, published_category
+):
+    posts = mixer.cycle(2).blend("blog.Post", category=published_category)
+    kept = mixer.blend("blog.Comment", post=posts[0], text="Останется")
+    comments = [
+        mixer.blend("blog.Comment", post=post, text="Удаляемый отзыв")
+        for post in posts for _ in range(10)
+    ]
+    selected = [comment.pk for comment in comments]
+    response = admin_client.post("/admin/blog/comment/", {
+        "action": "delete_selected", "_selected_action": selected,
+    })
+    assert response.status_code == 200, (
+        "Убедитесь, что массовое удаление комментариев требует"
+        " подтверждения."
+    )
+    assert Comment.objects.count() == len(comments) + 1
+    with CaptureQueriesContext(connection) as context:
+        response = admin_client.post("/admin/blog/comment/", {
+            "action": "delete_selected",
+            "post": "yes",
+            "_selected_action": selected,
+        })
+    assert response.status_code == 302
+    deletes = [
+        query["sql"] for query in context.captured_queries
+        if query["sql"].startswith('DELETE FROM "blog_comment"')
+    ]
+    assert len(deletes) == 1, (
+        "Убедитесь, что массовое удаление комментариев выполняется одним"
+        " запросом."
+    )
+    assert list(Comment.objects.all()) == [kept]
+    assert [
+        post.comment_count for post in Post.objects.filter(
+            pk__in=[post.pk for post in posts]).order_by("pk")
+    ] == [1, 0]
+    backend = get_search_backend()
+    assert list(backend.search(Post.objects.all(), "отзыв")) == []
+    assert list(backend.search(Post.objects.all(), "останется")) == [
+        posts[0]]
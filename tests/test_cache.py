@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+import pytest
+from django.test.client import Client
+from django.utils import timezone
+
+from blog.cache import feed_cache_timeout
+from blog.utils import get_scheduled_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_card_cache_invalidation(
+    user_client: Client, post_with_published_location, PostModel
+):
+    post = post_with_published_location
+    content = user_client.get("/").content.decode("utf-8")
+    assert post.category.title in content
+
+    post.category.title = "Новое название категории"
+    post.category.save()
+    post.location.name = "Новое место"
+    post.location.save()
+    PostModel.objects.filter(pk=post.pk).update(comment_count=42)
+    content = user_client.get("/").content.decode("utf-8")
+    assert "Новое название категории" in content, (
+        "Убедитесь, что карточка публикации обновляется при изменении"
+        " категории."
+    )
+    assert "Новое место" in content, (
+        "Убедитесь, что карточка публикации обновляется при изменении"
+        " местоположения."
+    )
+    assert "Комментарии (42)" in content, (
+        "Убедитесь, что карточка публикации обновляется при изменении"
+        " количества комментариев."
+    )
+
+
+def test_anonymous_page_cache(
+    client: Client, user_client: Client, django_assert_num_queries,
+    post_with_published_location, mixer,
+):
+    post = post_with_published_location
+    for url in ("/", f"/category/{post.category.slug}/", f"/posts/{post.id}/"):
+        client.get(url)
+        with django_assert_num_queries(0):
+            response = client.get(url)
+        assert response.status_code == 200
+        assert post.title in response.content.decode("utf-8")
+
+    mixer.blend("blog.Comment", post=post, text="Свежий комментарий")
+    response = client.get(f"/posts/{post.id}/")
+    assert "Свежий комментарий" in response.content.decode("utf-8"), (
+        "Убедитесь, что кэш страницы сбрасывается при новом комментарии."
+    )
+
+    user_client.get("/")
+    with django_assert_num_queries(3):
+        user_client.get("/")
+
+
+def test_feed_cache_timeout_before_scheduled_post(
+    mixer, published_category, django_assert_num_queries
+):
+    assert feed_cache_timeout(600, "index", get_scheduled_posts()) == 600
+    mixer.blend(
+        "blog.Post",
+        is_published=True,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    assert feed_cache_timeout(600, "index", get_scheduled_posts()) <= 30, (
+        "Убедитесь, что кэш ленты истекает к моменту отложенной публикации."
+    )
+    with django_assert_num_queries(0):
+        timeout = feed_cache_timeout(600, "index", get_scheduled_posts())
+    assert timeout <= 30, (
+        "Убедитесь, что дата ближайшей отложенной публикации кэшируется."
+    )
+
+
+def test_anonymous_page_cache_ignores_unknown_params(
+    client: Client, django_assert_num_queries, post_with_published_location,
+):
+    client.get("/")
+    for query in ("?x=1", "?x=2&utm_source=mail"):
+        with django_assert_num_queries(0):
+            response = client.get(f"/{query}")
+        assert response.status_code == 200, (
+            "Убедитесь, что параметры, которые страница не читает, не"
+            " создают новых записей в кэше."
+        )
+    response = client.get("/?page=1")
+    assert response.status_code == 200
@@ -0,0 +1,37 @@
+import pytest
+from django.core.management import call_command
+from django.test.client import Client
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(
+    user_client: Client, user, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Текст"})
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Ещё"})
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что при добавлении комментария увеличивается счётчик"
+        " комментариев публикации."
+    )
+
+    comment = post.comments.first()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}")
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что при удалении комментария уменьшается счётчик"
+        " комментариев публикации."
+    )
+
+
+def test_update_comment_counts_command(
+    mixer, post_with_published_location, PostModel
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    PostModel.objects.update(comment_count=0)
+    call_command("update_comment_counts", batch_size=1)
+    post.refresh_from_db()
+    assert post.comment_count == 3
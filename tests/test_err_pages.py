@@ -122,3 +122,46 @@ def test_custom_err_handlers(client, user_client):
     )
 
     settings.DEBUG = debug
+
+
+@pytest.mark.django_db
+def test_not_found_page_cached(client, user_client, user):
+    first = client.get("/missing-page/")
+    assert first.status_code == 404
+    second = client.get("/another-missing-page/")
+    assert second.status_code == 404
+    assert second.templates == [], (
+        "Убедитесь, что страница ошибки 404 отрисовывается один раз и"
+        " затем берётся из кэша."
+    )
+    content = second.content.decode("utf-8")
+    assert "/another-missing-page/" in content
+    assert "placeholder" not in content
+
+    content = user_client.get("/missing-page/").content.decode("utf-8")
+    assert user.username in content
+
+
+@pytest.mark.django_db
+def test_repeated_not_found_short_circuited(client, settings):
+    settings.NOT_FOUND_LIMIT = 2
+    for _ in range(settings.NOT_FOUND_LIMIT):
+        assert "<html" in client.get("/missing-page/").content.decode()
+    response = client.get("/missing-page/")
+    assert response.status_code == 404
+    assert response["Content-Type"].startswith("text/plain"), (
+        "Убедитесь, что повторные ответы 404 одному клиенту не"
+        " отрисовываются целиком."
+    )
+
+
+def test_error_page_fallback(monkeypatch):
+    from pages import prerender, views
+
+    def broken_render(*args, **kwargs):
+        raise RuntimeError
+
+    monkeypatch.setattr(prerender, "render_to_string", broken_render)
+    response = views.server_error(HttpRequest())
+    assert response.status_code == 500
+    assert "Ошибка 500" in response.content.decode("utf-8")
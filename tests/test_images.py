@@ -0,0 +1,325 @@
+import os
+from datetime import timedelta
+from io import BytesIO
+
+import pytest
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test.client import Client
+from django.utils import timezone
+from PIL import Image, ImageFile
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_image_file(width, height, name="big_image.jpg"):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), color=(73, 109, 137)).save(
+        buffer, format="JPEG"
+    )
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/jpeg")
+
+
+def test_post_image_derivatives(
+    user_client: Client, published_category, PostModel, settings
+):
+    response = user_client.post(
+        "/posts/create/",
+        data={
+            "title": "Пост с картинкой",
+            "text": "Текст",
+            "pub_date": "2020-01-01T10:00",
+            "category": published_category.id,
+            "is_published": True,
+            "image": make_image_file(1200, 600),
+        },
+    )
+    assert response.status_code == 302
+    post = PostModel.objects.get(title="Пост с картинкой")
+    assert post.image_widths == [], (
+        "Убедитесь, что уменьшенные копии изображения создаются в фоновой"
+        " задаче, а до её выполнения показывается оригинал."
+    )
+    assert post.image.url in user_client.get("/").content.decode("utf-8")
+
+    call_command("process_tasks", once=True, processes=0)
+    post.refresh_from_db()
+    assert post.image_widths == sorted(settings.POST_IMAGE_WIDTHS)
+
+    storage = post.image.storage
+    for width in post.image_widths:
+        for extension in ("jpg", "webp"):
+            name = post.image.name.rsplit(".", 1)[0] + f"_w{width}.{extension}"
+            assert storage.exists(name), (
+                "Убедитесь, что для изображения публикации создаются"
+                " уменьшенные копии."
+            )
+            with storage.open(name) as file:
+                assert Image.open(file).width == width
+
+    content = user_client.get("/").content.decode("utf-8")
+    assert post.image_srcset in content
+    assert 'type="image/webp"' in content
+
+
+def test_image_task_failure_is_recorded(
+    post_with_published_location, settings
+):
+    from blog.models import Task
+    from blog.tasks import process_post_image
+
+    task = process_post_image.delay(post_with_published_location.id)
+    Task.objects.filter(pk=task.pk).update(args=["not an id"])
+    call_command("process_tasks", once=True, processes=0)
+    task.refresh_from_db()
+    assert task.status == Task.FAILED
+    assert task.attempts == settings.TASK_MAX_ATTEMPTS, (
+        "Убедитесь, что задача с ошибкой повторяется до"
+        " `TASK_MAX_ATTEMPTS` раз."
+    )
+    assert task.error, "Убедитесь, что ошибка задачи сохраняется."
+
+
+def test_stale_running_task_requeued(post_with_published_location, settings):
+    from blog.models import Task
+    from blog.tasks import claim_tasks, process_post_image
+
+    Task.objects.all().delete()
+    task = process_post_image.delay(post_with_published_location.id)
+    assert claim_tasks(10) == [task.pk]
+    assert claim_tasks(10) == []
+    Task.objects.filter(pk=task.pk).update(
+        updated_at=timezone.now() - timedelta(seconds=settings.TASK_TIMEOUT + 1)
+    )
+    assert claim_tasks(10) == [task.pk], (
+        "Убедитесь, что задача, брошенная упавшим обработчиком,"
+        " возвращается в очередь."
+    )
+    Task.objects.filter(pk=task.pk).update(
+        attempts=settings.TASK_MAX_ATTEMPTS,
+        updated_at=timezone.now() - timedelta(seconds=settings.TASK_TIMEOUT + 1),
+    )
+    assert claim_tasks(10) == []
+    task.refresh_from_db()
+    assert task.status == Task.FAILED
+
+
+def create_post_with_image(client, category, image):
+    return client.post(
+        "/posts/create/",
+        data={
+            "title": "Пост с картинкой",
+            "text": "Текст",
+            "pub_date": "2020-01-01T10:00",
+            "category": category.id,
+            "is_published": True,
+            "image": image,
+        },
+    )
+
+
+def test_oversized_upload_rejected(
+    user_client: Client, published_category, PostModel, settings
+):
+    image = make_image_file(200, 100)
+    settings.UPLOAD_MAX_FILE_SIZE = image.size - 1
+    response = create_post_with_image(user_client, published_category, image)
+    assert response.status_code == 200
+    assert "image" in response.context["form"].errors, (
+        "Убедитесь, что файл больше `UPLOAD_MAX_FILE_SIZE` не принимается."
+    )
+    assert not PostModel.objects.exists()
+
+
+@pytest.mark.parametrize("image_format", ["JPEG", "PNG"])
+def test_too_many_pixels_rejected_before_decode(
+    user_client: Client, published_category, PostModel, settings, monkeypatch,
+    image_format,
+):
+    settings.POST_IMAGE_MAX_PIXELS = 100 * 100
+    buffer = BytesIO()
+    Image.new("RGB", (200, 100)).save(buffer, format=image_format)
+    image = SimpleUploadedFile(
+        f"big_image.{image_format.lower()}", buffer.getvalue(),
+        f"image/{image_format.lower()}",
+    )
+
+    def fail_load(self):
+        raise AssertionError("Изображение не должно декодироваться.")
+
+    monkeypatch.setattr(ImageFile.ImageFile, "load", fail_load)
+    response = create_post_with_image(user_client, published_category, image)
+    assert response.status_code == 200
+    assert "image" in response.context["form"].errors, (
+        "Убедитесь, что изображения больше `POST_IMAGE_MAX_PIXELS` пикселей"
+        " отклоняются по заголовку файла."
+    )
+    assert not PostModel.objects.exists()
+
+
+def test_uploaded_image_metadata_stripped(
+    user_client: Client, published_category, PostModel
+):
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    exif[0x010F] = "Camera maker"
+    buffer = BytesIO()
+    Image.new("RGB", (200, 100)).save(buffer, format="JPEG", exif=exif)
+    image = SimpleUploadedFile("photo.jpg", buffer.getvalue(), "image/jpeg")
+    response = create_post_with_image(user_client, published_category, image)
+    assert response.status_code == 302
+
+    post = PostModel.objects.get()
+    with post.image.open("rb") as file:
+        saved = Image.open(file)
+        saved_exif = dict(saved.getexif())
+        saved.load()
+    assert saved.size == (200, 100)
+    assert saved_exif == {0x0112: 6}, (
+        "Убедитесь, что из загруженного изображения удаляются метаданные,"
+        " кроме ориентации."
+    )
+
+
+def test_same_image_stored_once(
+    user_client: Client, published_category, PostModel,
+    django_capture_on_commit_callbacks, settings,
+):
+    settings.ORPHAN_IMAGE_GRACE_PERIOD = 0
+    content = make_image_file(200, 100).read()
+    for name in ("first.jpg", "second.JPG"):
+        image = SimpleUploadedFile(name, content, "image/jpeg")
+        assert create_post_with_image(
+            user_client, published_category, image
+        ).status_code == 302
+    first, second = PostModel.objects.order_by("id")
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые изображения хранятся в одном файле."
+    )
+    storage = first.image.storage
+    name = first.image.name
+
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+    assert storage.exists(name), (
+        "Убедитесь, что файл не удаляется, пока на него ссылаются"
+        " другие публикации."
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        second.delete()
+    assert not storage.exists(name), (
+        "Убедитесь, что файл удаляется вместе с последней публикацией,"
+        " которая на него ссылается."
+    )
+
+
+def test_replaced_image_deleted(
+    user_client: Client, published_category, PostModel,
+    django_capture_on_commit_callbacks, settings,
+):
+    settings.ORPHAN_IMAGE_GRACE_PERIOD = 0
+    create_post_with_image(
+        user_client, published_category, make_image_file(1200, 600)
+    )
+    call_command("process_tasks", once=True, processes=0)
+    post = PostModel.objects.get()
+    storage, old_name = post.image.storage, post.image.name
+    derivative = old_name.rsplit(".", 1)[0] + f"_w{post.image_widths[0]}.jpg"
+    assert storage.exists(derivative)
+
+    post.image = make_image_file(300, 100, name="new.jpg")
+    with django_capture_on_commit_callbacks(execute=True):
+        post.save()
+    assert post.image.name != old_name
+    assert not storage.exists(old_name)
+    assert not storage.exists(derivative), (
+        "Убедитесь, что при замене изображения удаляются и его копии."
+    )
+
+
+def test_process_tasks_workers_do_not_inherit_connection(
+    post_with_published_location, monkeypatch
+):
+    from blog.management.commands import process_tasks
+    from blog.tasks import process_post_image
+
+    for _ in range(2):
+        process_post_image.delay(post_with_published_location.id)
+    events = []
+
+    class Executor:
+        def __init__(self, **kwargs):
+            pass
+
+        def map(self, func, batch):
+            # Процессы пула создаются здесь, при раздаче задач.
+            events.append("map")
+            return map(func, batch)
+
+        def shutdown(self):
+            pass
+
+    class Connections:
+        def close_all(self):
+            events.append("close")
+
+    monkeypatch.setattr(process_tasks, "ProcessPoolExecutor", Executor)
+    monkeypatch.setattr(process_tasks, "connections", Connections())
+    call_command("process_tasks", once=True, processes=2, batch_size=1)
+    assert events.count("map") >= 2
+    assert all(
+        events[i - 1] == "close" for i, event in enumerate(events)
+        if event == "map"
+    ), (
+        "Убедитесь, что соединение с базой закрывается перед каждой"
+        " раздачей задач процессам-обработчикам."
+    )
+
+
+def test_stale_image_task_keeps_new_widths(
+    user_client: Client, published_category, PostModel
+):
+    response = create_post_with_image(
+        user_client, published_category, make_image_file(1200, 600))
+    assert response.status_code == 302
+    stale = PostModel.objects.get()
+    PostModel.objects.filter(pk=stale.pk).update(
+        image="images/00/00/replaced.jpg", image_widths=[])
+    assert not stale.update_image_derivatives()
+    assert PostModel.objects.get().image_widths == [], (
+        "Убедитесь, что задача для заменённого изображения не записывает"
+        " ширины уменьшенных копий нового."
+    )
+
+
+def test_reused_image_not_deleted_as_orphan(
+    user_client: Client, published_category, PostModel,
+    django_capture_on_commit_callbacks,
+):
+    content = make_image_file(200, 100).read()
+    create_post_with_image(
+        user_client, published_category,
+        SimpleUploadedFile("first.jpg", content, "image/jpeg"),
+    )
+    post = PostModel.objects.get()
+    storage, name = post.image.storage, post.image.name
+    path = storage.path(name)
+    os.utime(path, (0, 0))
+
+    # Новая публикация уже переиспользовала файл, но ещё не сохранена.
+    storage.save("second.jpg", SimpleUploadedFile("second.jpg", content))
+    with django_capture_on_commit_callbacks(execute=True):
+        post.delete()
+    assert storage.exists(name), (
+        "Убедитесь, что недавно переиспользованный файл не удаляется как"
+        " осиротевший."
+    )
+
+    call_command("delete_orphan_images")
+    assert storage.exists(name)
+    os.utime(path, (0, 0))
+    call_command("delete_orphan_images")
+    assert not storage.exists(name), (
+        "Убедитесь, что команда `delete_orphan_images` удаляет файлы, на"
+        " которые не ссылаются публикации."
+    )
@@ -0,0 +1,181 @@
+from datetime import timedelta
+
+import pytest
+from bs4 import BeautifulSoup
+from django.test import override_settings
+from django.test.client import Client
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.paginators import CachedCountPaginator
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_cursor_links(response):
+    soup = BeautifulSoup(response.content.decode("utf-8"), "html.parser")
+    links = {}
+    for link in soup.select("a"):
+        href = link["href"]
+        if "cursor=" in href:
+            links[link.get_text(strip=True)] = href
+    return links
+
+
+@override_settings(CURSOR_PAGINATION=True, PAGE_CACHE_TIMEOUT=0)
+def test_cursor_pagination(
+    mixer: Mixer, client: Client, django_assert_max_num_queries,
+    published_category,
+):
+    now = timezone.now()
+    # Часть публикаций с одинаковой датой: порядок задаётся ещё и по id.
+    pub_dates = (
+        now - timedelta(hours=n // 2) for n in range(1, N_PER_PAGE * 3)
+    )
+    mixer.cycle(N_PER_PAGE * 3 - 1).blend(
+        "blog.Post",
+        is_published=True,
+        category=published_category,
+        pub_date=pub_dates,
+    )
+    expected = list(
+        published_category.posts.order_by("-pub_date", "-id")
+        .values_list("id", flat=True)
+    )
+
+    pages = []
+    url = "/"
+    while url:
+        with django_assert_max_num_queries(1):
+            response = client.get(url)
+        assert response.status_code == 200
+        pages.append([post.id for post in response.context["page_obj"]])
+        next_link = get_cursor_links(response).get(">>")
+        url = f"/{next_link}" if next_link else None
+    assert [post_id for page in pages for post_id in page] == expected, (
+        "Убедитесь, что при курсорной пагинации публикации не теряются и"
+        " не повторяются."
+    )
+
+    previous_link = get_cursor_links(response).get("<<")
+    response = client.get(f"/{previous_link}")
+    assert [
+        post.id for post in response.context["page_obj"]
+    ] == pages[-2], (
+        "Убедитесь, что ссылка на предыдущую страницу ведёт на неё."
+    )
+
+
+@override_settings(CURSOR_PAGINATION=True)
+def test_cursor_pagination_invalid_cursor(client: Client):
+    response = client.get("/?cursor=broken")
+    assert response.status_code == 404
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+def test_cached_page_count(
+    mixer: Mixer, client: Client, django_assert_max_num_queries,
+    published_category,
+):
+    mixer.cycle(N_PER_PAGE * 2).blend(
+        "blog.Post", is_published=True, category=published_category
+    )
+    client.get("/")
+    with django_assert_max_num_queries(1):
+        response = client.get("/?page=2")
+    assert response.context["paginator"].count == N_PER_PAGE * 2
+
+    mixer.blend("blog.Post", is_published=True, category=published_category)
+    response = client.get("/?page=2")
+    assert response.context["paginator"].count == N_PER_PAGE * 2 + 1, (
+        "Убедитесь, что кэш числа публикаций сбрасывается при публикации"
+        " нового поста."
+    )
+
+
+def test_windowed_page_range():
+    paginator = CachedCountPaginator(list(range(1000)), N_PER_PAGE)
+    page_range = list(paginator.page(50).page_range)
+    assert page_range[0] == 1 and page_range[-1] == paginator.num_pages
+    assert paginator.ELLIPSIS in page_range
+    assert len(page_range) < 10
+
+
+def test_comment_pagination(
+    mixer: Mixer, client: Client, post_with_published_location, settings
+):
+    post = post_with_published_location
+    comments = mixer.cycle(settings.COMMENTS_PAGINATION * 2 + 1).blend(
+        "blog.Comment", post=post
+    )
+    response = client.get(f"/posts/{post.id}/")
+    shown = [comment.id for comment in response.context["comments"]]
+    assert len(shown) == settings.COMMENTS_PAGINATION, (
+        "Убедитесь, что на странице поста выводится ограниченное число"
+        " комментариев."
+    )
+    next_link = get_cursor_links(response).get("Показать ещё комментарии")
+    while next_link:
+        response = client.get(next_link)
+        assert response.status_code == 200
+        shown += [comment.id for comment in response.context["comments"]]
+        next_link = get_cursor_links(response).get(
+            "Показать ещё комментарии"
+        )
+    assert shown == [comment.id for comment in comments], (
+        "Убедитесь, что подгрузка комментариев выводит их все по порядку."
+    )
+
+
+def test_more_comments_link(
+    mixer: Mixer, client: Client, post_with_published_location, settings
+):
+    post = post_with_published_location
+    mixer.cycle(settings.COMMENTS_PAGINATION + 1).blend(
+        "blog.Comment", post=post
+    )
+    response = client.get(f"/posts/{post.id}/")
+    soup = BeautifulSoup(response.content.decode("utf-8"), "html.parser")
+    link = soup.find("a", attrs={"data-comments-url": True})
+    assert link is not None
+    assert soup.find("script", src=lambda src: src and "comments" in src), (
+        "Убедитесь, что страница поста подключает скрипт подгрузки"
+        " комментариев."
+    )
+
+    fragment = client.get(
+        link["data-comments-url"], HTTP_X_REQUESTED_WITH="XMLHttpRequest"
+    )
+    assert fragment.status_code == 200
+    assert "<html" not in fragment.content.decode("utf-8")
+    assert len(fragment.context["comments"]) == 1
+
+    page = client.get(link["href"])
+    assert page.status_code == 200
+    assert "<html" in page.content.decode("utf-8"), (
+        "Убедитесь, что ссылка «Показать ещё комментарии» без JavaScript"
+        " открывает полную страницу публикации."
+    )
+    assert len(page.context["comments"]) == 1
+
+
+def test_feed_mixins_default_hooks(rf, settings):
+    from django.views.generic import ListView
+
+    from blog.mixins import CachedCountPaginationMixin
+    from blog.views import CommentListView, PostDetailView
+
+    class PlainList(CachedCountPaginationMixin, ListView):
+        queryset = list(range(5))
+
+    view = PlainList()
+    view.setup(rf.get("/"))
+    paginator = view.get_paginator(view.queryset, 2)
+    assert paginator.count == 5
+    for view_class in (PostDetailView, CommentListView):
+        view = view_class()
+        assert view.get_cache_timeout(60) == 60, (
+            "Убедитесь, что страницы без ленты используют время жизни"
+            " кэша по умолчанию."
+        )
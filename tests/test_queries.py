@@ -0,0 +1,227 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Q
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.test.client import Client
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.models import Comment, Post
+from blog.search import get_backend as get_search_backend
+from blog.utils import get_available_posts
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+# Холодный кэш: число публикаций, ближайшая отложенная публикация и
+# сама страница ленты (для профиля ещё и автор).
+INDEX_MAX_QUERIES = 3
+PROFILE_MAX_QUERIES = 4
+POST_DETAIL_MAX_QUERIES = 2
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+@pytest.mark.parametrize("n_posts", [1, N_PER_PAGE])
+def test_index_queries(
+    mixer: Mixer, client: Client, django_assert_max_num_queries,
+    published_category, published_location, n_posts
+):
+    mixer.cycle(n_posts).blend(
+        "blog.Post",
+        is_published=True,
+        category=published_category,
+        location=published_location,
+    )
+    with django_assert_max_num_queries(INDEX_MAX_QUERIES):
+        response = client.get("/")
+    assert len(response.context["page_obj"]) == n_posts, (
+        "Убедитесь, что на главной странице отображаются все публикации."
+    )
+
+
+@pytest.mark.parametrize("n_posts", [1, N_PER_PAGE])
+def test_profile_queries(
+    mixer: Mixer, client: Client, django_assert_max_num_queries,
+    user, published_category, published_location, n_posts
+):
+    mixer.cycle(n_posts).blend(
+        "blog.Post",
+        author=user,
+        is_published=True,
+        category=published_category,
+        location=published_location,
+    )
+    with django_assert_max_num_queries(PROFILE_MAX_QUERIES):
+        response = client.get(f"/profile/{user.username}/")
+    assert len(response.context["page_obj"]) == n_posts, (
+        "Убедитесь, что на странице пользователя отображаются все его"
+        " публикации."
+    )
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite",
+    reason="План запроса проверяется для SQLite.",
+)
+@pytest.mark.parametrize(
+    "get_queryset, index_name",
+    [
+        (lambda: Post.objects.published(), "post_published_idx"),
+        (lambda: get_available_posts(), "post_published_idx"),
+        (
+            lambda: get_available_posts().filter(
+                category__slug="slug"
+            ),
+            "post_category_pub_date_idx",
+        ),
+        (
+            lambda: get_available_posts().filter(author_id=1),
+            "post_author_pub_date_idx",
+        ),
+        (
+            lambda: get_available_posts(filter_published=False).filter(
+                author_id=1
+            ),
+            "post_author_pub_date_idx",
+        ),
+    ],
+)
+def test_feed_queries_use_indexes(get_queryset, index_name):
+    plan = get_queryset().explain()
+    assert f"USING INDEX {index_name}" in plan, (
+        f"Убедитесь, что запрос ленты использует индекс `{index_name}`."
+        f" План запроса:\n{plan}"
+    )
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+def test_post_detail_queries(
+    mixer: Mixer, client: Client, another_user_client: Client,
+    django_assert_max_num_queries, post_with_published_location,
+):
+    post = post_with_published_location
+    mixer.cycle(N_PER_PAGE).blend("blog.Comment", post=post)
+    with django_assert_max_num_queries(POST_DETAIL_MAX_QUERIES):
+        response = client.get(f"/posts/{post.id}/")
+    assert response.status_code == 200
+    assert len(response.context["comments"]) == N_PER_PAGE
+
+    # Для авторизованного пользователя добавляются сессия и сам пользователь.
+    with django_assert_max_num_queries(POST_DETAIL_MAX_QUERIES + 2):
+        another_user_client.get(f"/posts/{post.id}/")
+
+
+@pytest.mark.parametrize(
+    "url, table",
+    [
+        ("/posts/{post_id}/edit/", "blog_post"),
+        ("/posts/{post_id}/delete/", "blog_post"),
+        ("/posts/{post_id}/edit_comment/{comment_id}", "blog_comment"),
+        ("/posts/{post_id}/delete_comment/{comment_id}", "blog_comment"),
+    ],
+)
+def test_author_only_views_load_object_once(
+    mixer: Mixer, user_client: Client, user, post_with_published_location,
+    url, table,
+):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    url = url.format(post_id=post.id, comment_id=comment.id)
+    with CaptureQueriesContext(connection) as context:
+        response = user_client.get(url)
+    assert response.status_code == 200
+    object_queries = [
+        query for query in context.captured_queries
+        if f'FROM "{table}"' in query["sql"]
+    ]
+    assert len(object_queries) == 1, (
+        f"Убедитесь, что страница `{url}` загружает объект из базы один раз."
+    )
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+@pytest.mark.parametrize("url", ["/", "/profile/{username}/"])
+def test_feed_does_not_load_post_text(
+    mixer: Mixer, client: Client, user, published_category, url
+):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        is_published=True,
+        category=published_category,
+        text=" ".join(f"слово{i}" for i in range(100)),
+    )
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url.format(username=user.username))
+    post_queries = [
+        query["sql"] for query in context.captured_queries
+        if 'FROM "blog_post"' in query["sql"] and "LIMIT" in query["sql"]
+    ]
+    assert post_queries
+    assert all('"blog_post"."text"' not in sql for sql in post_queries), (
+        "Убедитесь, что ленты не загружают полный текст публикаций."
+    )
+    assert post.excerpt in response.content.decode("utf-8")
+
+
+def test_update_post_excerpts(mixer: Mixer, published_category):
+    post = mixer.blend(
+        "blog.Post", category=published_category, text="Один два три"
+    )
+    assert post.excerpt == "Один два три"
+    Post.objects.filter(pk=post.pk).update(excerpt="")
+    call_command("update_post_excerpts")
+    post.refresh_from_db()
+    assert post.excerpt == "Один два три"
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite",
+    reason="План запроса проверяется для SQLite.",
+)
+@pytest.mark.parametrize("after", [False, True])
+def test_comment_page_query_uses_index(after):
+    queryset = Comment.objects.filter(post_id=1)
+    if after:
+        queryset = queryset.filter(
+            Q(created_at__gt=timezone.now())
+            | Q(created_at=timezone.now(), id__gt=1)
+        )
+    plan = queryset.order_by("created_at", "id")[:11].explain()
+    assert "USING INDEX comment_post_created_at_idx" in plan, (
+        "Убедитесь, что страница комментариев выбирается по индексу"
+        f" `comment_post_created_at_idx`. План запроса:\n{plan}"
+    )
+    assert "TEMP B-TREE" not in plan, (
+        "Убедитесь, что страница комментариев не сортирует всю ветку."
+        f" План запроса:\n{plan}"
+    )
+
+
+def test_save_with_deferred_text_does_not_load_it(
+    mixer: Mixer, published_category
+):
+    post = mixer.blend(
+        "blog.Post", category=published_category, title="Старый",
+        text="Один два три",
+    )
+    post = Post.objects.defer("text").get(pk=post.pk)
+    post.title = "Новый"
+    with CaptureQueriesContext(connection) as context:
+        post.save()
+    assert not [
+        query for query in context.captured_queries
+        if query["sql"].startswith("SELECT")
+        and '"blog_post"."text"' in query["sql"]
+    ], (
+        "Убедитесь, что сохранение публикации с отложенным текстом не"
+        " загружает текст."
+    )
+    post = Post.objects.get(pk=post.pk)
+    assert post.excerpt == "Один два три"
+    assert list(get_search_backend().search(Post.objects.all(), "новый")) == [
+        post]
+    assert list(get_search_backend().search(Post.objects.all(), "два")) == [
+        post]
@@ -0,0 +1,140 @@
+import pytest
+from bs4 import BeautifulSoup
+from django.core.management import call_command
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_post(mixer: Mixer, published_category):
+    def make(**kwargs):
+        kwargs.setdefault("is_published", True)
+        kwargs.setdefault("category", published_category)
+        kwargs.setdefault("pub_date", timezone.now() - timezone.timedelta(1))
+        return mixer.blend("blog.Post", **kwargs)
+
+    return make
+
+
+def search(client, query, **params):
+    response = client.get("/search/", {"q": query, **params})
+    assert response.status_code == 200
+    return list(response.context["page_obj"])
+
+
+def test_search_ranks_title_matches_first(client: Client, make_post):
+    in_text = make_post(title="Заметка", text="Поездка на Байкал зимой")
+    in_title = make_post(title="Байкал", text="Озеро и лёд")
+    make_post(title="Другое", text="Ничего общего")
+    assert search(client, "байкал") == [in_title, in_text], (
+        "Убедитесь, что поиск находит публикации по заголовку и тексту и"
+        " выше ставит совпадения в заголовке."
+    )
+    assert search(client, "байк") == [in_title, in_text]
+    assert search(client, 'байкал"*(') == [in_title, in_text]
+    assert search(client, "") == []
+
+
+def test_search_respects_visibility(
+    client: Client, make_post, mixer: Mixer
+):
+    make_post(title="Скрытая", is_published=False)
+    make_post(
+        title="Скрытая",
+        pub_date=timezone.now() + timezone.timedelta(1),
+    )
+    make_post(
+        title="Скрытая",
+        category=mixer.blend("blog.Category", is_published=False),
+    )
+    visible = make_post(title="Скрытая, но опубликованная")
+    assert search(client, "скрытая") == [visible], (
+        "Убедитесь, что поиск выводит только опубликованные публикации."
+    )
+
+
+def test_search_index_updated_on_save_and_delete(client: Client, make_post):
+    post = make_post(title="Старый заголовок")
+    post.title = "Новый заголовок"
+    post.save()
+    assert search(client, "старый") == []
+    assert search(client, "новый") == [post]
+    post.delete()
+    assert search(client, "новый") == []
+
+
+def test_search_pagination(client: Client, make_post, settings):
+    for _ in range(settings.PAGINATION + 1):
+        make_post(title="Страница")
+    response = client.get("/search/", {"q": "страница"})
+    assert "?q=%D1%81%D1%82%D1%80%D0%B0%D0%BD%D0%B8%D1%86%D0%B0&amp;page=2" in (
+        response.content.decode("utf-8")
+    ), "Убедитесь, что ссылки пагинации сохраняют поисковый запрос."
+    assert len(search(client, "страница", page=2)) == 1
+    soup = BeautifulSoup(response.content.decode("utf-8"), "html.parser")
+    numbers = [
+        link.get_text(strip=True) for link in soup.select("a.page-link")
+    ]
+    assert "2" in numbers, (
+        "Убедитесь, что на странице поиска выводятся номера страниц."
+    )
+
+
+def test_like_backend(client: Client, make_post, settings):
+    settings.SEARCH_BACKEND = "blog.search.LikeSearchBackend"
+    post = make_post(title="Байкал", text="Озеро")
+    assert search(client, "Байкал Озеро") == [post]
+
+
+def test_rebuild_search_index(client: Client, make_post):
+    post = make_post(title="Байкал")
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM blog_post_fts")
+    assert search(client, "байкал") == []
+    call_command("rebuild_search_index")
+    assert search(client, "байкал") == [post]
+
+
+def test_search_finds_word_forms(client: Client, make_post):
+    post = make_post(title="Путешествия", text="Мы ходили по красивым горам")
+    assert search(client, "путешествие") == [post]
+    assert search(client, "красивая гора") == [post], (
+        "Убедитесь, что поиск находит другие формы слов запроса."
+    )
+    assert search(client, "и по на") == []
+
+
+def test_search_indexes_comments(
+    client: Client, make_post, mixer: Mixer
+):
+    post = make_post(title="Заметка", text="Текст")
+    comment = mixer.blend("blog.Comment", post=post, text="Отличные фотографии")
+    assert search(client, "фотография") == [post], (
+        "Убедитесь, что поиск учитывает текст комментариев."
+    )
+    comment.delete()
+    assert search(client, "фотография") == []
+
+
+def test_comment_indexed_without_reloading_thread(
+    client: Client, make_post, mixer: Mixer
+):
+    post = make_post(title="Заметка", text="Текст")
+    mixer.cycle(20).blend("blog.Comment", post=post, text="Старый отзыв")
+    with CaptureQueriesContext(connection) as context:
+        mixer.blend("blog.Comment", post=post, text="Отличные фотографии")
+    assert not [
+        query for query in context.captured_queries
+        if query["sql"].startswith("SELECT")
+        and '"blog_comment"."text"' in query["sql"]
+    ], (
+        "Убедитесь, что новый комментарий индексируется без перечитывания"
+        " остальных комментариев публикации."
+    )
+    assert search(client, "фотография") == [post]
+    assert search(client, "отзыв") == [post]
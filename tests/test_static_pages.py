@@ -1,3 +1,7 @@
+import pytest
+from django.core.management import call_command
+
+
 def test_static_pages_as_cbv():
     try:
         from pages import urls
@@ -26,3 +30,29 @@ def test_static_pages_as_cbv():
                 "Убедитесь, что в файле `pages/urls.py` маршруты статических"
                 " страниц подключены с помощью CBV."
             )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", ["/pages/about/", "/pages/rules/"])
+def test_prerendered_pages(settings, tmp_path, client, user_client, user, url):
+    settings.PRERENDERED_PAGES_DIR = tmp_path
+    rendered = client.get(url)
+    assert not rendered.has_header("ETag")
+
+    call_command("prerender_pages")
+    response = client.get(url)
+    assert response.templates == [], (
+        "Убедитесь, что заранее отрисованные страницы отдаются без"
+        " шаблонизатора."
+    )
+    assert response.content == rendered.content
+    assert client.get(
+        url, HTTP_IF_NONE_MATCH=response["ETag"]
+    ).status_code == 304
+
+    content = user_client.get(url).content.decode("utf-8")
+    assert f"/profile/{user.username}/" in content, (
+        "Убедитесь, что в шапке страницы для авторизованного пользователя"
+        " выводится его имя."
+    )
+    assert "placeholder" not in content
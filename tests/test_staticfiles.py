@@ -0,0 +1,48 @@
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test.client import Client
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def collected_static(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    call_command("collectstatic", interactive=False, verbosity=0)
+    return tmp_path
+
+
+def test_static_urls_hashed(collected_static, client: Client):
+    css_url = staticfiles_storage.url("css/bootstrap.min.css")
+    assert css_url != "/static/css/bootstrap.min.css", (
+        "Убедитесь, что имена файлов статики содержат хеш содержимого."
+    )
+    name = css_url[len("/static/"):]
+    assert (collected_static / f"{name}.gz").exists(), (
+        "Убедитесь, что при сборке статики создаются сжатые копии файлов."
+    )
+    logo_url = staticfiles_storage.url("img/logo.png")
+    assert logo_url in client.get("/").content.decode("utf-8")
+
+
+def test_hashed_static_served_immutable(collected_static, client: Client):
+    url = staticfiles_storage.url("css/bootstrap.min.css")
+    response = client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+    assert response.status_code == 200
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Content-Type"] == "text/css"
+    assert "immutable" in response["Cache-Control"], (
+        "Убедитесь, что файлы статики с хешем в имени отдаются с заголовком"
+        " `Cache-Control: immutable`."
+    )
+    assert "Accept-Encoding" in response["Vary"]
+
+    response = client.get("/static/css/bootstrap.min.css")
+    assert "Content-Encoding" not in response
+    assert "immutable" not in response["Cache-Control"]
+
+
+def test_static_url_without_collectstatic(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    assert staticfiles_storage.url("img/logo.png") == "/static/img/logo.png"
@@ -0,0 +1,34 @@
+import pytest
+
+from blog.stemmer import TermDictionary, normalize, stem, tokenize
+
+
+@pytest.mark.parametrize(
+    "word, expected",
+    [
+        ("вагоне", "вагон"),
+        ("важнейшими", "важн"),
+        ("ответственность", "ответствен"),
+        ("красивая", "красив"),
+        ("красивыми", "красив"),
+        ("программирование", "программирован"),
+        ("читавшие", "чита"),
+        ("улыбнувшись", "улыбнувш"),
+        ("пишется", "пишет"),
+        ("Ёжик", "ежик"),
+    ],
+)
+def test_stem(word, expected):
+    assert stem(word) == expected
+
+
+def test_tokenize_drops_stop_words():
+    assert tokenize("Ёлка и сосна, в лесу!") == ["елка", "сосна", "лесу"]
+
+
+def test_term_dictionary_memoizes_stems():
+    dictionary = TermDictionary(max_size=3)
+    assert normalize("горы гора горами", dictionary) == "гор гор гор"
+    assert len(dictionary) == 3
+    dictionary["лес"]
+    assert len(dictionary) == 1
@@ -0,0 +1,56 @@
+import pytest
+from django.test.client import Client
+
+from blog.stylesheets import find_words, purge
+
+CSS = """/*! banner */:root{--x:1}
+.btn { color : red; }
+.unused,.card>.card-body{margin:0}
+.btn:not(.disabled):hover{content:"a ; b"}
+@media (min-width:576px){.unused{x:1}.btn{y:2}}
+@media print{.unused{x:1}}
+"""
+
+
+def test_purge_keeps_only_used_rules():
+    result = purge(CSS, find_words('<a class="btn card card-body">'))
+    assert result == (
+        '/*! banner */:root{--x:1}.btn{color : red}'
+        '.card>.card-body{margin:0}'
+        '.btn:not(.disabled):hover{content:"a ; b"}'
+        '@media (min-width:576px){.btn{y:2}}'
+    )
+
+
+@pytest.mark.django_db
+def test_site_css_fallback(client: Client, settings):
+    settings.PAGE_CACHE_TIMEOUT = 0
+    settings.SITE_CSS = "css/missing.css"
+    content = client.get("/").content.decode("utf-8")
+    assert "bootstrap" in content, (
+        "Убедитесь, что без собранного CSS подключается Bootstrap из CDN."
+    )
+    settings.SITE_CSS = "css/site.min.css"
+    content = client.get("/").content.decode("utf-8")
+    assert "/static/css/site.min.css" in content
+
+
+@pytest.mark.django_db
+def test_site_css_resolved_once(client: Client, settings, monkeypatch):
+    from django.contrib.staticfiles import finders
+
+    settings.PAGE_CACHE_TIMEOUT = 0
+    settings.SITE_CSS = "css/site.min.css"
+    client.get("/")
+    calls = []
+    find = finders.find
+    monkeypatch.setattr(
+        finders, "find", lambda *args, **kwargs: calls.append(args)
+        or find(*args, **kwargs)
+    )
+    client.get("/")
+    client.get("/")
+    assert not calls, (
+        "Убедитесь, что файл CSS сайта ищется один раз, а не при каждой"
+        " отрисовке страницы."
+    )